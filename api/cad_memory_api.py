@@ -1,11 +1,29 @@
-from fastapi import APIRouter, HTTPException
-from datetime import datetime
+from fastapi import APIRouter, Body, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+from pydantic import ValidationError
 from core.memory_store import (
     get_part_memory,
+    get_part_memories,
+    get_part_revision,
     save_part_memory,
-    log_action
+    save_part_memories,
+    append_memory_log,
+    part_exists,
+    list_parts,
+    get_archived_entries,
+    patch_part_memory,
+    RevisionMismatch,
+    memory_cache_stats,
+    HEAVY_FIELDS
 )
 from core.memory_types import PartMemory, MemoryLogEntry
+from core.file_locks import lock_wait_stats
+from core.json_patch import JsonPatchError
+from core.memory_events import events, EVENTS_POLL_SECONDS
 from core.dfm_engine import run_dfm_check
 from core.dfm_overlay_generator import generate_dfm_overlay
 from core.tooling_advisor import tooling_advice
@@ -14,16 +32,88 @@ from core.cost_optimizer import simulate_cost
 
 router = APIRouter()
 
+def _not_modified(part_id: str, request: Request, response: Response, include_log: bool = False) -> Optional[Response]:
+    """
+    Sets the part's revision as the ETag. Returns a 304 response when the client's
+    If-None-Match already names it, otherwise None so the endpoint builds its body as usual.
+    """
+    revision = get_part_revision(part_id, include_log=include_log)
+    if revision is None:
+        return None
+    etag = f'"{revision}"'
+    client_tags = [t.strip() for t in request.headers.get("if-none-match", "").split(",")]
+    if etag in client_tags or f"W/{etag}" in client_tags or "*" in client_tags:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
+
+@router.get("/memory-cache/stats")
+def get_memory_cache_stats():
+    return memory_cache_stats()
+
+@router.get("/storage/lock-stats")
+def get_lock_stats():
+    return lock_wait_stats()
+
+@router.get("/parts")
+def list_part_catalog(
+    process: Optional[str] = None,
+    material: Optional[str] = None,
+    min_quantity: Optional[int] = None,
+    max_quantity: Optional[int] = None,
+    min_score: Optional[int] = None,
+    max_score: Optional[int] = None,
+    updated_since: Optional[str] = None,
+    updated_until: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500)
+):
+    try:
+        return list_parts(
+            cursor=cursor,
+            limit=limit,
+            process=process,
+            material=material,
+            min_quantity=min_quantity,
+            max_quantity=max_quantity,
+            min_score=min_score,
+            max_score=max_score,
+            updated_since=updated_since,
+            updated_until=updated_until
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/memory")
+def fetch_memories(ids: str = Query(..., description="Comma-separated part ids")):
+    part_ids = [i.strip() for i in ids.split(",") if i.strip()]
+    found = get_part_memories(part_ids)
+    return {
+        "parts": found,
+        "missing": [i for i in dict.fromkeys(part_ids) if i not in found]
+    }
+
+@router.post("/memory/batch")
+def save_memories(memories: List[PartMemory]):
+    save_part_memories(memories)
+    return {"status": "success", "saved": len(memories)}
+
 @router.get("/memory/{part_id}", response_model=PartMemory)
-def fetch_memory(part_id: str):
+def fetch_memory(part_id: str, request: Request, response: Response):
+    not_modified = _not_modified(part_id, request, response, include_log=True)
+    if not_modified:
+        return not_modified
     memory = get_part_memory(part_id)
     if not memory:
         raise HTTPException(status_code=404, detail="Part memory not found")
     return memory
 
 @router.get("/memory/{part_id}/summary")
-def summarize_memory(part_id: str):
-    memory = get_part_memory(part_id)
+def summarize_memory(part_id: str, request: Request, response: Response):
+    not_modified = _not_modified(part_id, request, response)
+    if not_modified:
+        return not_modified
+    memory = get_part_memory(part_id, heavy_fields=())
     if not memory:
         raise HTTPException(status_code=404, detail="Memory not found")
     return {
@@ -40,23 +130,93 @@ def save_memory(part_id: str, memory: PartMemory):
     save_part_memory(memory)
     return {"status": "success", "message": f"Memory saved for part {part_id}"}
 
+@router.patch("/memory/{part_id}")
+def patch_memory(part_id: str, request: Request, response: Response, operations: List[Dict[str, Any]] = Body(...)):
+    """
+    RFC 6902 JSON Patch. Send the part's ETag as If-Match, or start with a `test /revision`
+    operation, to have the patch rejected with 412 if someone else changed the part in the
+    meantime.
+    """
+    if_match = request.headers.get("if-match")
+    expected = if_match.strip().removeprefix("W/").strip('"') if if_match else None
+    try:
+        revision = patch_part_memory(part_id, operations, expected_revision=expected)
+    except RevisionMismatch as e:
+        raise HTTPException(status_code=412, detail=f"Part changed; current revision is {e}")
+    except JsonPatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+    if revision is None:
+        raise HTTPException(status_code=404, detail="Part memory not found")
+    response.headers["ETag"] = f'"{revision}"'
+    return {"status": "success", "revision": revision}
+
 @router.patch("/memory/{part_id}/log")
 def add_log(part_id: str, log: MemoryLogEntry):
-    memory = get_part_memory(part_id)
-    if not memory:
+    if not part_exists(part_id):
         raise HTTPException(status_code=404, detail="Part memory not found")
-    updated = log_action(memory, log.action, log.detail)
-    save_part_memory(updated)
+    append_memory_log(part_id, log.action, log.detail)
     return {"status": "success", "message": "Log entry added"}
 
+async def _part_event_stream(part_id: str, request: Request):
+    queue = events.subscribe(part_id)
+    try:
+        revision = await run_in_threadpool(get_part_revision, part_id, True)
+        yield f"event: ready\ndata: {json.dumps({'part_id': part_id, 'revision': revision})}\n\n"
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=EVENTS_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                # Saves in other worker processes only show up as a new revision.
+                current = await run_in_threadpool(get_part_revision, part_id, True)
+                if current != revision:
+                    revision = current
+                    yield f"event: changed\ndata: {json.dumps({'part_id': part_id, 'revision': revision})}\n\n"
+                else:
+                    yield ": keep-alive\n\n"
+                continue
+            revision = await run_in_threadpool(get_part_revision, part_id, True)
+            # The same token as the ETag and the other events, so it can be sent back as If-Match.
+            event = {**event, "revision": revision}
+            yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+    finally:
+        events.unsubscribe(part_id, queue)
+
+@router.get("/memory/{part_id}/events")
+def stream_part_events(part_id: str, request: Request):
+    """
+    Server-sent events for one part: `saved` when the part is saved, `log` when memory_log
+    entries are appended, and `changed` when another worker process changed it. Every event
+    carries the part's revision as of the event, the same token as its ETag.
+    """
+    if not part_exists(part_id):
+        raise HTTPException(status_code=404, detail="Part memory not found")
+    return StreamingResponse(
+        _part_event_stream(part_id, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/memory/{part_id}/archive/{field}")
+def fetch_archived_entries(part_id: str, field: str, cursor: Optional[int] = None):
+    if field not in HEAVY_FIELDS:
+        raise HTTPException(status_code=404, detail=f"No archive for field {field}")
+    if not part_exists(part_id):
+        raise HTTPException(status_code=404, detail="Part memory not found")
+    return get_archived_entries(part_id, field, cursor)
+
 @router.post("/memory/{part_id}/dfm-check")
 def trigger_dfm_analysis(part_id: str):
     updated = run_dfm_check(part_id)
     return {"status": "success", "dfm_issues": [i.dict() for i in updated.dfm_issues]}
 
 @router.get("/memory/{part_id}/dfm-overlay")
-def get_dfm_overlay(part_id: str):
-    memory = get_part_memory(part_id)
+def get_dfm_overlay(part_id: str, request: Request, response: Response):
+    not_modified = _not_modified(part_id, request, response)
+    if not_modified:
+        return not_modified
+    memory = get_part_memory(part_id, heavy_fields=())
     if not memory:
         raise HTTPException(status_code=404, detail="Part not found")
     overlays = generate_dfm_overlay(memory.dfm_issues)
@@ -71,10 +231,16 @@ def get_handoff_guide(part_id: str):
     return generate_handoff_guide(part_id)
 
 @router.get("/memory/{part_id}/cost-simulation")
-def get_cost_estimate(part_id: str):
+def get_cost_estimate(part_id: str, request: Request, response: Response):
+    not_modified = _not_modified(part_id, request, response)
+    if not_modified:
+        return not_modified
     return simulate_cost(part_id)
 
 @router.get("/memory/{part_id}/cost-curve")
-def get_cost_curve(part_id: str):
+def get_cost_curve(part_id: str, request: Request, response: Response):
     from core.cost_optimizer import simulate_cost_curve
+    not_modified = _not_modified(part_id, request, response)
+    if not_modified:
+        return not_modified
     return simulate_cost_curve(part_id)
@@ -16,7 +16,7 @@ class DesignIntentInput(BaseModel):
 
 @router.post("/intent/save")
 def save_design_intent(data: DesignIntentInput):
-    memory = get_part_memory(data.part_id)
+    memory = get_part_memory(data.part_id, heavy_fields=())
     if not memory:
         memory = PartMemory(
             part_id=data.part_id,
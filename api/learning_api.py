@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from core.learning_log import log_action, get_logs_for_part
 
 router = APIRouter()
@@ -21,5 +21,5 @@ def write_learning_log(part_id: str, action_type: str, details: str):
     return {"status": "logged"}
 
 @router.get("/log/{part_id}", response_model=List[LearningLogEntry])
-def read_learning_log(part_id: str):
-    return get_logs_for_part(part_id)
+def read_learning_log(part_id: str, since: Optional[str] = None, until: Optional[str] = None):
+    return get_logs_for_part(part_id, since, until)
@@ -1,20 +1,85 @@
-from fastapi import APIRouter, HTTPException, Request
-from core.learning_log_v2 import add_feedback_entry, get_all_feedback_logs, update_feedback_entry
+from typing import Any, Dict, Iterator, Optional
+from fastapi import APIRouter, Body, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from core import serializers
+from core.learning_log_v2 import (
+    RESERVED_KEYS, add_feedback_entry, decode_feedback_cursor, list_feedback, query_feedback, update_feedback_entry
+)
 
 router = APIRouter()
 
+# Bytes gathered before a chunk of a streamed response is sent.
+STREAM_CHUNK_BYTES = 64 * 1024
+
+def _chunked(pieces: Iterator[bytes]) -> Iterator[bytes]:
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= STREAM_CHUNK_BYTES:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+def _json_array(query: dict) -> Iterator[bytes]:
+    yield b"["
+    for index, (_, entry) in enumerate(query_feedback(**query)):
+        yield (b"," if index else b"") + serializers.dumps_json(entry)
+    yield b"]"
+
+def _ndjson(query: dict, limit: Optional[int]) -> Iterator[bytes]:
+    count = 0
+    last = None
+    for position, entry in query_feedback(**query):
+        if count == limit:
+            yield serializers.dumps_json({"next_cursor": last}) + b"\n"
+            return
+        yield serializers.dumps_json(entry) + b"\n"
+        count += 1
+        last = position
+
 @router.get("/logs/feedback")
-def get_logs():
-    return get_all_feedback_logs()
+def get_logs(
+    module: Optional[str] = None,
+    partId: Optional[str] = None,
+    decision: Optional[str] = None,
+    userRole: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    format: str = Query("json", regex="^(json|ndjson)$")
+):
+    """
+    Feedback entries matching the filters, in log order. Without `limit` or `cursor` the
+    full JSON array is streamed. With them the response is one page,
+    {"entries": [...], "next_cursor": ...}. format=ndjson streams one entry per line; when
+    `limit` cuts it short the last line is {"next_cursor": ...}. Responses are produced
+    entry by entry, so memory use does not grow with the log.
+    """
+    try:
+        decode_feedback_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    query = dict(module=module, partId=partId, decision=decision, userRole=userRole, since=since, until=until, cursor=cursor)
+    if format == "ndjson":
+        return StreamingResponse(_chunked(_ndjson(query, limit)), media_type="application/x-ndjson")
+    if limit is None and cursor is None:
+        return StreamingResponse(_chunked(_json_array(query)), media_type="application/json")
+    return list_feedback(limit=limit or 100, **query)
 
+# Plain defs: both wait on the rollup transaction and the log writer, so they run in the threadpool.
 @router.post("/logs/feedback")
-def add_log(request: Request):
-    data = request.json()
+def add_log(data: Dict[str, Any] = Body(...)):
     entry = add_feedback_entry(**data)
     return entry
 
 @router.patch("/logs/feedback/{entry_id}")
-def update_log(entry_id: str, request: Request):
-    data = request.json()
+def update_log(entry_id: str, data: Dict[str, Any] = Body(...)):
+    reserved = [key for key in RESERVED_KEYS if key in data]
+    if reserved:
+        raise HTTPException(status_code=400, detail=f"Cannot update: {', '.join(reserved)}")
     update_feedback_entry(entry_id, data)
     return {"status": "ok"}
@@ -0,0 +1,14 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException
+from core.log_export import export_log
+
+router = APIRouter()
+
+@router.post("/logs/export/{log}")
+def export_log_files(log: str, fmt: str = "parquet", since: Optional[str] = None, until: Optional[str] = None):
+    try:
+        return export_log(log, fmt, since, until)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
@@ -0,0 +1,9 @@
+from typing import Optional
+from fastapi import APIRouter
+from core.log_rollups import get_rollups
+
+router = APIRouter()
+
+@router.get("/logs/rollups")
+def read_rollups(name: Optional[str] = None):
+    return get_rollups(name)
@@ -3,9 +3,9 @@
 from fastapi import FastAPI, Request
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
-import json
 from datetime import datetime
 import uuid
+from core.knowledge_pool import append_knowledge
 
 app = FastAPI()
 
@@ -24,13 +24,13 @@ class KnowledgeEntry(BaseModel):
     material: str
     process: str
 
+# A plain def: append_knowledge() waits for the log writer, so this runs in the threadpool.
 @app.post("/append_entry")
-async def append_entry(entry: KnowledgeEntry):
+def append_entry(entry: KnowledgeEntry):
     item = entry.dict()
     item['id'] = str(uuid.uuid4())
     item['timestamp'] = datetime.utcnow().isoformat()
 
-    with open("axis5_knowledge_pool.jsonl", "a") as f:
-        f.write(json.dumps(item) + "\n")
+    append_knowledge([item])
 
     return {"status": "ok", "id": item['id']}
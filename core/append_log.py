@@ -0,0 +1,709 @@
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from core import serializers
+from core.file_locks import atomic_write_bytes, locked, match_mode
+from core.memory_backends import SQLiteConnections
+
+# A log starts a new segment every day, or sooner once the current one reaches this size.
+SEGMENT_MAX_BYTES = int(os.getenv("AXIS5_LOG_SEGMENT_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def encode_line(entry: Dict) -> bytes:
+    return serializers.dumps_json(entry) + b"\n"
+
+
+def decode_line(line: bytes) -> Optional[Dict]:
+    if not line.strip():
+        return None
+    try:
+        return serializers.loads_json(line)
+    except ValueError:
+        return None
+
+
+def in_range(timestamp, since: Optional[str], until: Optional[str]) -> bool:
+    """
+    ISO timestamp range check. Bounds may be given at any precision: until="2025-06-01"
+    includes the whole of that day. Entries without a timestamp only match an open range.
+    """
+    if since is None and until is None:
+        return True
+    if not isinstance(timestamp, str):
+        return False
+    if since is not None and timestamp < since:
+        return False
+    if until is not None and timestamp[:len(until)] > until:
+        return False
+    return True
+
+
+class AppendLogIndex:
+    """
+    Persistent key -> (segment, line offset) index for an AppendLog, in a SQLite sidecar.
+    Appends record their offsets as they write. For every segment the index remembers
+    which file (inode) it describes and how far into it it has got, so after a crash, a
+    compaction or an append by an older writer it catches up by scanning only what it
+    has not seen. Offsets are into the uncompressed lines, so compressing a segment
+    leaves its entries valid.
+    """
+
+    def __init__(self, path: Path, key: Callable[[Dict], Optional[str]]):
+        self.key = key
+        self._connections = SQLiteConnections(path, self._create_schema)
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection):
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT NOT NULL, segment TEXT NOT NULL, offset INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_key ON entries (key, segment, offset)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_segment ON entries (segment)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS segments "
+                "(name TEXT PRIMARY KEY, file_id INTEGER NOT NULL, indexed_upto INTEGER NOT NULL)"
+            )
+
+    def state(self) -> Dict[str, Tuple[int, int]]:
+        rows = self._connections.get().execute("SELECT name, file_id, indexed_upto FROM segments")
+        return {row["name"]: (row["file_id"], row["indexed_upto"]) for row in rows}
+
+    def record(self, segment: str, file_id: int, start: int, end: int, entries: List[Tuple[Dict, int]]):
+        """Indexes entries just appended to `segment` between `start` and `end`, if it was indexed up to `start`."""
+        conn = self._connections.get()
+        with conn:
+            if start == 0:
+                # A new (or recreated) segment file: rows left for that name describe another file.
+                conn.execute("DELETE FROM entries WHERE segment = ?", (segment,))
+            elif self.state().get(segment) != (file_id, start):
+                return
+            self._insert(conn, segment, entries)
+            self._set_state(conn, segment, file_id, end)
+
+    def catch_up(self, segment: str, f, file_id: int):
+        """Indexes whatever `f` (the segment's lines) holds beyond the indexed prefix. Callers hold the log's lock."""
+        conn = self._connections.get()
+        with conn:
+            indexed_file, offset = self.state().get(segment, (None, 0))
+            if indexed_file != file_id:
+                conn.execute("DELETE FROM entries WHERE segment = ?", (segment,))
+                offset = 0
+            f.seek(offset)
+            entries = []
+            for line in f:
+                entry = decode_line(line)
+                if entry is not None:
+                    entries.append((entry, offset))
+                offset += len(line)
+            self._insert(conn, segment, entries)
+            self._set_state(conn, segment, file_id, offset)
+
+    def set_file_id(self, segment: str, file_id: int):
+        """Points a segment's rows at a new file holding the same lines (e.g. its compressed copy)."""
+        conn = self._connections.get()
+        with conn:
+            conn.execute("UPDATE segments SET file_id = ? WHERE name = ?", (file_id, segment))
+
+    def drop(self, segments: Sequence[str]):
+        conn = self._connections.get()
+        with conn:
+            conn.executemany("DELETE FROM entries WHERE segment = ?", [(name,) for name in segments])
+            conn.executemany("DELETE FROM segments WHERE name = ?", [(name,) for name in segments])
+
+    def offsets(self, key: str, segments: Sequence[str]) -> List[Tuple[str, int]]:
+        wanted = set(segments)
+        rows = self._connections.get().execute(
+            "SELECT segment, offset FROM entries WHERE key = ? ORDER BY segment, offset", (key,)
+        )
+        return [(row["segment"], row["offset"]) for row in rows if row["segment"] in wanted]
+
+    def snapshot(self, key: str, segments: Sequence[str]) -> Tuple[Dict[str, Tuple[int, int]], List[Tuple[str, int]]]:
+        """Segment state and the key's offsets, read in one transaction so they describe the same files."""
+        conn = self._connections.get()
+        conn.execute("BEGIN")
+        try:
+            return self.state(), self.offsets(key, segments)
+        finally:
+            conn.execute("COMMIT")
+
+    def counts(self, keys: Sequence[str]) -> Dict[str, int]:
+        """How many indexed entries each of `keys` has; keys without any are left out."""
+        keys = list(dict.fromkeys(keys))
+        counts = {}
+        conn = self._connections.get()
+        # Batched to stay under SQLite's limit on query parameters.
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            rows = conn.execute(
+                f"SELECT key, COUNT(*) AS n FROM entries WHERE key IN ({','.join('?' * len(batch))}) GROUP BY key", batch
+            )
+            counts.update((row["key"], row["n"]) for row in rows)
+        return counts
+
+    def segments_for(self, key: str) -> List[str]:
+        rows = self._connections.get().execute(
+            "SELECT DISTINCT segment FROM entries WHERE key = ? ORDER BY segment", (key,)
+        )
+        return [row["segment"] for row in rows]
+
+    @staticmethod
+    def _set_state(conn: sqlite3.Connection, segment: str, file_id: int, indexed_upto: int):
+        conn.execute(
+            "INSERT OR REPLACE INTO segments (name, file_id, indexed_upto) VALUES (?, ?, ?)",
+            (segment, file_id, indexed_upto)
+        )
+
+    def _insert(self, conn: sqlite3.Connection, segment: str, entries: List[Tuple[Dict, int]]):
+        rows = [(self.key(entry), segment, offset) for entry, offset in entries]
+        conn.executemany(
+            "INSERT INTO entries (key, segment, offset) VALUES (?, ?, ?)", [row for row in rows if row[0] is not None]
+        )
+
+
+class _SegmentReplaced(Exception):
+    pass
+
+
+class AppendLog:
+    """
+    Append-only JSONL log, partitioned into time-ordered segments under `root`: one
+    `<YYYY-MM-DD>-<n>.jsonl` file per day (more if a day outgrows SEGMENT_MAX_BYTES),
+    listed in `manifest.json` together with each sealed segment's entry count and
+    timestamp range. Writing an entry is a single append to the current segment, range
+    reads open only the segments that can hold matching entries, and old segments can be
+    compressed or dropped without touching the rest.
+
+    A torn last line (a crash mid-write) is skipped on read and never merges with the next
+    entry. `legacy_paths` are older single-file forms of the log (JSONL or a JSON array),
+    newest format first; the first one found is imported once, the first time the log is
+    used, and left in place. With `index_key`, entries are indexed by that key so read_key() touches only
+    the matching lines.
+    """
+
+    def __init__(self, root: Path, metric: str, legacy_paths: Sequence[Path] = (),
+                 index_key: Optional[Callable[[Dict], Optional[str]]] = None, timestamp_key: str = "timestamp"):
+        self.root = Path(root)
+        self.metric = metric
+        self.legacy_paths = [Path(p) for p in legacy_paths]
+        self.timestamp_key = timestamp_key
+        self.manifest_path = self.root / "manifest.json"
+        self.index = AppendLogIndex(self.root / "index.sqlite", index_key) if index_key else None
+        self._converted = False
+
+    def __str__(self) -> str:
+        return str(self.root)
+
+    # Segments and the manifest
+
+    def segments(self) -> List[Dict]:
+        try:
+            return serializers.loads_json(self.manifest_path.read_bytes())["segments"]
+        except FileNotFoundError:
+            return []
+
+    def _write_segments(self, segments: List[Dict]):
+        atomic_write_bytes(self.manifest_path, serializers.dumps_json({"segments": segments}))
+
+    def _lock(self):
+        return locked(self.manifest_path, self.metric)
+
+    def _plain_path(self, name: str) -> Path:
+        return self.root / f"{name}.jsonl"
+
+    def _gzip_path(self, name: str) -> Path:
+        return self.root / f"{name}.jsonl.gz"
+
+    def _open_segment(self, name: str):
+        """The segment's lines, compressed or not, or None once it has been dropped."""
+        try:
+            return open(self._plain_path(name), "rb")
+        except FileNotFoundError:
+            pass
+        try:
+            return gzip.open(self._gzip_path(name), "rb")
+        except FileNotFoundError:
+            return None
+
+    def _file_state(self, name: str) -> Optional[Tuple[int, Optional[int]]]:
+        """(inode, size) of a plain segment, (inode, None) of a compressed one."""
+        try:
+            st = os.stat(self._plain_path(name))
+            return (st.st_ino, st.st_size)
+        except FileNotFoundError:
+            pass
+        try:
+            return (os.stat(self._gzip_path(name)).st_ino, None)
+        except FileNotFoundError:
+            return None
+
+    def _timestamp(self, entry) -> Optional[str]:
+        return entry.get(self.timestamp_key) if isinstance(entry, dict) else None
+
+    def _segment_stats(self, name: str) -> Dict:
+        count = 0
+        size = 0
+        low = high = None
+        f = self._open_segment(name)
+        if f is not None:
+            with f:
+                for line in f:
+                    size += len(line)
+                    entry = decode_line(line)
+                    if entry is None:
+                        continue
+                    count += 1
+                    timestamp = self._timestamp(entry)
+                    if isinstance(timestamp, str):
+                        low = timestamp if low is None else min(low, timestamp)
+                        high = timestamp if high is None else max(high, timestamp)
+        return {"entries": count, "bytes": size, "min_ts": low, "max_ts": high}
+
+    def _current_segment(self) -> str:
+        """Name of the segment to append to, sealing the previous one at a day or size boundary. Caller holds the lock."""
+        segments = self.segments()
+        today = datetime.now().strftime("%Y-%m-%d")
+        current = segments[-1] if segments and not segments[-1].get("sealed") else None
+        if current is not None and current["name"][:10] == today:
+            state = self._file_state(current["name"])
+            if state is None or (state[1] or 0) < SEGMENT_MAX_BYTES:
+                return current["name"]
+        if current is not None:
+            current.update(self._segment_stats(current["name"]), sealed=True)
+        seq = max((int(s["name"][11:]) + 1 for s in segments if s["name"][:10] == today), default=0)
+        name = f"{today}-{seq:03d}"
+        segments.append({"name": name, "sealed": False})
+        self._write_segments(segments)
+        return name
+
+    def _select(self, since: Optional[str], until: Optional[str]) -> List[str]:
+        """Segments that can hold entries in the range; the current segment always qualifies."""
+        names = []
+        for segment in self.segments():
+            if segment.get("sealed") and (since is not None or until is not None):
+                if segment.get("min_ts") is None:
+                    continue
+                if since is not None and segment["max_ts"] < since:
+                    continue
+                if until is not None and segment["min_ts"][:len(until)] > until:
+                    continue
+            names.append(segment["name"])
+        return names
+
+    # Writing
+
+    def append(self, entry: Dict):
+        self.append_many([entry])
+
+    def append_many(self, entries: Iterable[Dict], durable: bool = False) -> Optional[Tuple[str, int]]:
+        """Appends `entries` in one write and returns the log position just past them (see end_position)."""
+        entries = list(entries)
+        if not entries:
+            return None
+        lines = [encode_line(entry) for entry in entries]
+        self._ensure_converted()
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._lock():
+            name = self._current_segment()
+            with open(self._plain_path(name), "a+b") as f:
+                start = f.seek(0, 2)
+                separator = self._separator(f)
+                f.write(separator + b"".join(lines))
+                if durable:
+                    f.flush()
+                    os.fsync(f.fileno())
+                end = f.tell()
+                file_id = os.fstat(f.fileno()).st_ino
+            if self.index is not None:
+                offset = start + len(separator)
+                positions = []
+                for entry, line in zip(entries, lines):
+                    positions.append((entry, offset))
+                    offset += len(line)
+                self.index.record(name, file_id, start, end, positions)
+        return (name, end)
+
+    def end_position(self) -> Optional[Tuple[str, int]]:
+        """
+        Where the log currently ends: (last segment, bytes of it holding complete lines), or
+        None while it is empty. Positions compare in log order as long as the log is only
+        appended to, so a reader can remember how far it got and skip what it already saw.
+        """
+        self._ensure_converted()
+        with self._lock():
+            segments = self.segments()
+            if not segments:
+                return None
+            last = segments[-1]
+            if last.get("compressed"):
+                return (last["name"], last["bytes"])
+            try:
+                with open(self._plain_path(last["name"]), "rb") as f:
+                    return (last["name"], self._complete_prefix(f))
+            except FileNotFoundError:
+                return (last["name"], 0)
+
+    def rewrite(self, entries: Iterable[Dict]):
+        """Replaces the whole log with `entries` in a single segment; only for maintenance."""
+        self._ensure_converted()
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._lock():
+            old = [segment["name"] for segment in self.segments()]
+            today = datetime.now().strftime("%Y-%m-%d")
+            seq = max((int(name[11:]) + 1 for name in old if name[:10] == today), default=0)
+            name = f"{today}-{seq:03d}"
+            atomic_write_bytes(self._plain_path(name), b"".join(encode_line(entry) for entry in entries))
+            self._write_segments([{"name": name, "sealed": False}])
+            self._remove_files(old)
+
+    def _remove_files(self, names: List[str]):
+        for name in names:
+            for path in (self._plain_path(name), self._gzip_path(name)):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+        if self.index is not None:
+            self.index.drop(names)
+
+    # Reading
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self.iter_entries()
+
+    def iter_entries(self, since: Optional[str] = None, until: Optional[str] = None,
+                     upto: Optional[Tuple[str, int]] = None) -> Iterator[Dict]:
+        """
+        Entries in log order, optionally limited to a timestamp range and to those before
+        position `upto` (see end_position), streamed segment by segment.
+        """
+        for _, entry in self.iter_segments(since, until, upto=upto):
+            if in_range(self._timestamp(entry), since, until):
+                yield entry
+
+    def iter_segments(self, since: Optional[str] = None, until: Optional[str] = None, start: Optional[str] = None,
+                      upto: Optional[Tuple[str, int]] = None) -> Iterator[Tuple[str, Dict]]:
+        """
+        (segment, entry) pairs from the segments that can hold entries in the range, from
+        segment `start` on and stopping at position `upto`. Entries are not filtered by timestamp.
+        """
+        self._ensure_converted()
+        for name in self._select(since, until):
+            if start is not None and name < start:
+                continue
+            if upto is not None and name > upto[0]:
+                break
+            for entry in self._read_segment(name, upto[1] if upto is not None and name == upto[0] else None):
+                yield name, entry
+
+    def read_all(self, since: Optional[str] = None, until: Optional[str] = None) -> List[Dict]:
+        return list(self.iter_entries(since, until))
+
+    def tail(self, count: int) -> List[Dict]:
+        """The last `count` entries, reading only the newest segments."""
+        self._ensure_converted()
+        names = []
+        seen = 0
+        for segment in reversed(self.segments()):
+            names.append(segment["name"])
+            seen += segment.get("entries", 0)
+            if seen >= count:
+                break
+        recent = deque(maxlen=count)
+        for name in reversed(names):
+            recent.extend(self._read_segment(name))
+        return list(recent)
+
+    def _read_segment(self, name: str, limit: Optional[int] = None) -> Iterator[Dict]:
+        f = self._open_segment(name)
+        if f is None:
+            return
+        with f:
+            position = 0
+            for line in f:
+                if limit is not None and position >= limit:
+                    break
+                position += len(line)
+                entry = decode_line(line)
+                if entry is not None:
+                    yield entry
+
+    def read_key(self, key: str, since: Optional[str] = None, until: Optional[str] = None) -> List[Dict]:
+        """Entries whose index key is `key`, in log order, reading only their lines."""
+        if self.index is None:
+            raise ValueError("This log has no index")
+        self._ensure_converted()
+        names = self._select(since, until)
+        if not self._stale(names):
+            entries = self._read_indexed(key, names, verify=True)
+            if entries is not None:
+                return [e for e in entries if in_range(self._timestamp(e), since, until)]
+        with self._lock():
+            names = self._select(since, until)
+            self._catch_up(names)
+            entries = self._read_indexed(key, names, verify=False)
+        return [e for e in entries if in_range(self._timestamp(e), since, until)]
+
+    def key_counts(self, keys: Sequence[str]) -> Dict[str, int]:
+        """How many entries have each of `keys` as index key (keys without any are left out), from the index alone."""
+        if self.index is None:
+            raise ValueError("This log has no index")
+        self._ensure_converted()
+        if self._stale(self._select(None, None)):
+            with self._lock():
+                self._catch_up(self._select(None, None))
+        return self.index.counts(keys)
+
+    def segments_for_key(self, key: str) -> List[str]:
+        return self.index.segments_for(key) if self.index is not None else []
+
+    def _catch_up(self, names: List[str]):
+        """Indexes what the index is missing of `names`. Callers hold the log's lock."""
+        for name in self._stale(names):
+            f = self._open_segment(name)
+            if f is not None:
+                with f:
+                    self.index.catch_up(name, f, os.fstat(f.fileno()).st_ino)
+
+    def _stale(self, names: List[str]) -> List[str]:
+        state = self.index.state()
+        stale = []
+        for name in names:
+            current = self._file_state(name)
+            if current is None:
+                continue
+            indexed = state.get(name)
+            if indexed is None or indexed[0] != current[0] or (current[1] is not None and indexed[1] != current[1]):
+                stale.append(name)
+        return stale
+
+    def _read_indexed(self, key: str, names: List[str], verify: bool) -> Optional[List[Dict]]:
+        state, rows = self.index.snapshot(key, names)
+        by_segment: Dict[str, List[int]] = {}
+        for name, offset in rows:
+            by_segment.setdefault(name, []).append(offset)
+        entries = []
+        for name in names:
+            if name not in by_segment:
+                continue
+            f = self._open_segment(name)
+            if f is None:
+                continue
+            with f:
+                # A compaction may have replaced the segment since; only trust offsets for this file.
+                if verify and state.get(name, (None, 0))[0] != os.fstat(f.fileno()).st_ino:
+                    return None
+                for offset in by_segment[name]:
+                    f.seek(offset)
+                    entry = decode_line(f.readline())
+                    if entry is not None:
+                        entries.append(entry)
+        return entries
+
+    # Maintenance
+
+    def compress_segments(self, older_than_days: int) -> int:
+        """Gzips sealed segments from before the cutoff. Their index entries stay valid."""
+        self._ensure_converted()
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).strftime("%Y-%m-%d")
+        count = 0
+        for segment in self.segments():
+            name = segment["name"]
+            if not segment.get("sealed") or segment.get("compressed") or name[:10] >= cutoff:
+                continue
+            plain = self._plain_path(name)
+            fd, tmp_name = tempfile.mkstemp(dir=str(self.root), prefix=f".{name}.", suffix=".tmp")
+            try:
+                with open(plain, "rb") as src, os.fdopen(fd, "wb") as raw:
+                    match_mode(raw.fileno(), plain)
+                    file_id = os.fstat(src.fileno()).st_ino
+                    with gzip.GzipFile(fileobj=raw, mode="wb") as dst:
+                        shutil.copyfileobj(src, dst)
+                    raw.flush()
+                    os.fsync(raw.fileno())
+                with self._lock():
+                    current = self._file_state(name)
+                    if current is None or current[0] != file_id:
+                        continue
+                    os.replace(tmp_name, self._gzip_path(name))
+                    segments = self.segments()
+                    for entry in segments:
+                        if entry["name"] == name:
+                            entry["compressed"] = True
+                    self._write_segments(segments)
+                    if self.index is not None and self.index.state().get(name) == current:
+                        self.index.set_file_id(name, os.stat(self._gzip_path(name)).st_ino)
+                    plain.unlink()
+                    count += 1
+            finally:
+                if os.path.exists(tmp_name):
+                    os.unlink(tmp_name)
+        return count
+
+    def drop_segments(self, before: str) -> int:
+        """Deletes sealed segments whose entries all predate `before` (an ISO date or timestamp)."""
+        self._ensure_converted()
+        with self._lock():
+            segments = self.segments()
+            dropped = [
+                s["name"] for s in segments
+                if s.get("sealed") and (s.get("max_ts") or s["name"][:10]) < before
+            ]
+            self._write_segments([s for s in segments if s["name"] not in dropped])
+            self._remove_files(dropped)
+        return len(dropped)
+
+    def compact(self, transform: Callable[[Callable[..., Iterator[Tuple[str, Dict]]]], Dict[str, Iterable[Dict]]]) -> bool:
+        """
+        Rewrites some segments, e.g. to fold update records into the entries they modify.
+        `transform` is handed `snapshot(names=None)`, which iterates (segment, entry) pairs over
+        a frozen view of the log and can be called repeatedly. It returns the new entries of
+        each segment it wants rewritten. That work runs without the lock; entries appended to
+        the current segment meanwhile are carried over verbatim when the results are swapped
+        in, oldest segment first, under the lock. Readers that opened a replaced file keep
+        reading it. Returns False if something else replaced one of the segments first.
+        """
+        self._ensure_converted()
+        frozen: Dict[str, Tuple[int, Optional[int], bool]] = {}
+        with self._lock():
+            order = [segment["name"] for segment in self.segments()]
+            sealed = {segment["name"]: segment.get("bytes") for segment in self.segments() if segment.get("sealed")}
+            for name in order:
+                state = self._file_state(name)
+                if state is None:
+                    continue
+                if state[1] is None:
+                    frozen[name] = (state[0], sealed.get(name), True)
+                else:
+                    with open(self._plain_path(name), "rb") as f:
+                        frozen[name] = (state[0], self._complete_prefix(f), False)
+
+        def snapshot(names: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, Dict]]:
+            wanted = set(names) if names is not None else None
+            for name in order:
+                if name not in frozen or (wanted is not None and name not in wanted):
+                    continue
+                file_id, size, _ = frozen[name]
+                f = self._open_segment(name)
+                if f is None:
+                    raise _SegmentReplaced(name)
+                with f:
+                    if os.fstat(f.fileno()).st_ino != file_id:
+                        raise _SegmentReplaced(name)
+                    position = 0
+                    for line in f:
+                        if size is not None and position >= size:
+                            break
+                        position += len(line)
+                        entry = decode_line(line)
+                        if entry is not None:
+                            yield name, entry
+
+        temps: Dict[str, str] = {}
+        try:
+            plans = transform(snapshot)
+            for name in order:
+                if name not in plans:
+                    continue
+                fd, tmp_name = tempfile.mkstemp(dir=str(self.root), prefix=f".{name}.", suffix=".tmp")
+                temps[name] = tmp_name
+                with os.fdopen(fd, "wb") as raw:
+                    match_mode(raw.fileno(), self._gzip_path(name) if frozen[name][2] else self._plain_path(name))
+                    out = gzip.GzipFile(fileobj=raw, mode="wb") if frozen[name][2] else raw
+                    for entry in plans[name]:
+                        out.write(encode_line(entry))
+                    if out is not raw:
+                        out.close()
+            with self._lock():
+                for name in temps:
+                    state = self._file_state(name)
+                    if state is None or state[0] != frozen[name][0]:
+                        return False
+                segments = self.segments()
+                for name in [n for n in order if n in temps]:
+                    file_id, size, compressed = frozen[name]
+                    with open(temps[name], "ab") as out:
+                        if not compressed:
+                            with open(self._plain_path(name), "rb") as current:
+                                current.seek(size)
+                                out.write(current.read())
+                        out.flush()
+                        os.fsync(out.fileno())
+                    os.replace(temps.pop(name), self._gzip_path(name) if compressed else self._plain_path(name))
+                    for segment in segments:
+                        if segment["name"] == name and segment.get("sealed"):
+                            segment.update(self._segment_stats(name))
+                    if self.index is not None:
+                        f = self._open_segment(name)
+                        with f:
+                            self.index.catch_up(name, f, os.fstat(f.fileno()).st_ino)
+                self._write_segments(segments)
+            return True
+        except _SegmentReplaced:
+            return False
+        finally:
+            for tmp_name in temps.values():
+                if os.path.exists(tmp_name):
+                    os.unlink(tmp_name)
+
+    def convert_legacy(self) -> int:
+        """
+        Imports the first existing legacy file as a sealed segment, unless the log already
+        exists. Returns the number of entries imported.
+        """
+        source = next((path for path in self.legacy_paths if path.exists()), None)
+        if source is None:
+            return 0
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._lock():
+            if self.manifest_path.exists():
+                return 0
+            staging = "import"
+            if source.suffix == ".jsonl":
+                shutil.copyfile(source, self._plain_path(staging))
+            else:
+                entries = serializers.loads(source.read_bytes()) or []
+                atomic_write_bytes(self._plain_path(staging), b"".join(encode_line(entry) for entry in entries))
+            stats = self._segment_stats(staging)
+            day = stats["min_ts"][:10] if stats["min_ts"] and len(stats["min_ts"]) >= 10 else "0000-00-00"
+            name = f"{day}-000"
+            os.replace(self._plain_path(staging), self._plain_path(name))
+            self._write_segments([{"name": name, "sealed": True, **stats}])
+            return stats["entries"]
+
+    def _ensure_converted(self):
+        if not self._converted:
+            self.convert_legacy()
+            self._converted = True
+
+    @staticmethod
+    def _separator(f) -> bytes:
+        # Start on a fresh line if the previous writer died halfway through one.
+        end = f.seek(0, 2)
+        if end == 0:
+            return b""
+        f.seek(end - 1)
+        separator = b"" if f.read(1) == b"\n" else b"\n"
+        f.seek(end)
+        return separator
+
+    @staticmethod
+    def _complete_prefix(f) -> int:
+        """Size of the file up to its last newline, leaving out a torn final line."""
+        end = f.seek(0, 2)
+        position = end
+        while position > 0:
+            start = max(position - 65536, 0)
+            f.seek(start)
+            chunk = f.read(position - start)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                return start + newline + 1
+            position = start
+        return 0
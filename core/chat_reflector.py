@@ -1,22 +1,20 @@
 # chat_reflector.py – Attach this to Axis5 chat handler to log and auto-reflect queries
 
-import json
 import re
 from datetime import datetime
 from collections import Counter
-
-query_log_file = "axis5_query_log.jsonl"
-knowledge_pool_file = "axis5_knowledge_pool.jsonl"
+from core.knowledge_pool import append_knowledge
+from core.log_writer import writer
+from core.query_log import append_query, query_log
 
 # Log every chat query
 def log_query_from_chat(query: str):
-    with open(query_log_file, "a") as f:
-        f.write(json.dumps({"query": query, "timestamp": datetime.utcnow().isoformat()}) + "\n")
+    append_query(query)
 
 # Reflect intelligently every N queries (buffered or timed)
 def reflect_and_generate(max_reflections: int = 3):
-    with open(query_log_file) as f:
-        queries = [json.loads(line)["query"] for line in f.readlines()[-50:]]  # limit to recent ones
+    writer.flush()  # queries are logged without waiting, so write out the queued ones first
+    queries = [entry["query"] for entry in query_log.tail(50)]  # limit to recent ones
 
     key_phrases = []
     for q in queries:
@@ -37,9 +35,7 @@ def reflect_and_generate(max_reflections: int = 3):
             "timestamp": datetime.utcnow().isoformat()
         })
 
-    with open(knowledge_pool_file, "a") as f:
-        for e in new_entries:
-            f.write(json.dumps(e) + "\n")
+    append_knowledge(new_entries)
 
     print(f"✅ Added {len(new_entries)} reflection entries from chat queries.")
 
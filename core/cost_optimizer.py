@@ -1,8 +1,8 @@
-from core.memory_store import get_part_memory
-from typing import Dict
+from core.part_context import PartContext, resolve_context
+from typing import Dict, Optional
 
-def simulate_cost(part_id: str) -> Dict:
-    memory = get_part_memory(part_id)
+def simulate_cost(part_id: str, ctx: Optional[PartContext] = None) -> Dict:
+    memory = resolve_context(part_id, ctx).memory
     if not memory:
         return {"error": "Part not found"}
 
@@ -38,8 +38,8 @@ def simulate_cost(part_id: str) -> Dict:
         "note": f"Simulated cost for {process} with {material} at qty {qty}"
     }
 
-def simulate_cost_curve(part_id: str):
-    memory = get_part_memory(part_id)
+def simulate_cost_curve(part_id: str, ctx: Optional[PartContext] = None):
+    memory = resolve_context(part_id, ctx).memory
     if not memory:
         return {"error": "Part not found"}
 
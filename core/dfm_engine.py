@@ -1,4 +1,6 @@
-from core.memory_store import get_part_memory, save_part_memory
+from typing import Optional
+from core.memory_store import save_part_memory
+from core.part_context import PartContext, resolve_context
 from core.dfm_router import get_dfm_rules
 from core.dfm_scoring import calculate_manufacturability_score
 from core.memory_types import PartMemory, DFMIssue
@@ -18,15 +20,15 @@ def get_material_thresholds(material_name: str):
         "min_draft_angle_deg": 0.5
     }
 
-def run_dfm_check(part_id: str) -> PartMemory:
-    memory = get_part_memory(part_id)
+def run_dfm_check(part_id: str, ctx: Optional[PartContext] = None, persist: bool = True) -> PartMemory:
+    memory = resolve_context(part_id, ctx).memory
     if not memory:
         raise ValueError("Part memory not found")
 
     material = memory.selected_material or ""
     process = memory.selected_process or ""
 
-    issues = get_dfm_rules(material, process)
+    issues = [rule.to_issue() for rule in get_dfm_rules(material, process)]
 
     # --- Material-aware DFM rules ---
     thresholds = get_material_thresholds(material)
@@ -49,5 +51,6 @@ def run_dfm_check(part_id: str) -> PartMemory:
 
     memory.dfm_issues = issues
     memory.manufacturability_score = calculate_manufacturability_score(issues)
-    save_part_memory(memory)
+    if persist:
+        save_part_memory(memory)
     return memory
@@ -1,6 +1,6 @@
-from core.dfm_rules_cnc import dfm_rules_cnc
-from core.dfm_rules_injection_molding import dfm_rules_injection_molding
-from core.dfm_rules_sheet_metal import dfm_rules_sheet_metal
+from typing import Tuple
+from core.memory_types import DFMRule
+from core.dfm_rules import dfm_rules_cnc, dfm_rules_injection_molding, dfm_rules_sheet_metal
 from core.dfm_rules_fdm import dfm_rules_fdm
 from core.dfm_rules_casting import dfm_rules_casting
 from core.dfm_rules_blow_molding import dfm_rules_blow_molding
@@ -12,7 +12,7 @@ from core.dfm_rules_wood_turning import dfm_rules_wood_turning
 from core.dfm_rules_compression_molding import dfm_rules_compression_molding
 from core.dfm_rules_die_casting import dfm_rules_die_casting
 
-def get_dfm_rules(material: str, process: str):
+def get_dfm_rules(material: str, process: str) -> Tuple[DFMRule, ...]:
     material = material.lower()
     process = process.lower()
 
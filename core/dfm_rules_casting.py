@@ -1,24 +1,26 @@
-from core.memory_types import DFMIssue
-from typing import List
+from functools import lru_cache
+from core.memory_types import DFMRule
+from typing import Tuple
 
-def dfm_rules_casting() -> List[DFMIssue]:
-    return [
-        DFMIssue(
+@lru_cache(maxsize=None)
+def dfm_rules_casting() -> Tuple[DFMRule, ...]:
+    return (
+        DFMRule(
             issue_type="Sharp Corner",
             description="Sharp internal corners can lead to hot spots or stress concentration in casting.",
             severity="high",
             suggested_fix="Use rounded fillets instead of sharp corners."
         ),
-        DFMIssue(
+        DFMRule(
             issue_type="Inconsistent Wall Thickness",
             description="Thick and thin wall transitions can cause uneven cooling and shrinkage defects.",
             severity="medium",
             suggested_fix="Maintain uniform wall thickness where possible."
         ),
-        DFMIssue(
+        DFMRule(
             issue_type="Complex Undercuts",
             description="Deep undercuts increase tooling complexity and cost.",
             severity="low",
             suggested_fix="Simplify geometry to avoid undercuts."
         )
-    ]
+    )
@@ -1,18 +1,20 @@
-from core.memory_types import DFMIssue
-from typing import List
+from functools import lru_cache
+from core.memory_types import DFMRule
+from typing import Tuple
 
-def dfm_rules_die_casting() -> List[DFMIssue]:
-    return [
-        DFMIssue(
+@lru_cache(maxsize=None)
+def dfm_rules_die_casting() -> Tuple[DFMRule, ...]:
+    return (
+        DFMRule(
             issue_type="Thick Section",
             description="Thick areas in die casting can lead to shrinkage porosity.",
             severity="high",
             suggested_fix="Core out or maintain uniform thickness throughout."
         ),
-        DFMIssue(
+        DFMRule(
             issue_type="No Draft Angle",
             description="Die cast parts require draft to avoid sticking in die.",
             severity="high",
             suggested_fix="Add 1–3° draft on all external walls."
         )
-    ]
+    )
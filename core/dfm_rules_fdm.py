@@ -1,24 +1,26 @@
-from core.memory_types import DFMIssue
-from typing import List
+from functools import lru_cache
+from core.memory_types import DFMRule
+from typing import Tuple
 
-def dfm_rules_fdm() -> List[DFMIssue]:
-    return [
-        DFMIssue(
+@lru_cache(maxsize=None)
+def dfm_rules_fdm() -> Tuple[DFMRule, ...]:
+    return (
+        DFMRule(
             issue_type="Unsupported Overhang",
             description="Overhangs exceeding 45° without support may collapse or cause poor surface finish.",
             severity="medium",
             suggested_fix="Add support or redesign overhang to be ≤ 45°."
         ),
-        DFMIssue(
+        DFMRule(
             issue_type="Thin Wall",
             description="Walls below 0.8mm may not print properly or warp.",
             severity="high",
             suggested_fix="Increase wall thickness to ≥ 1mm."
         ),
-        DFMIssue(
+        DFMRule(
             issue_type="Large Flat Area",
             description="Large flat bottom surfaces may warp due to uneven cooling.",
             severity="low",
             suggested_fix="Add ribs or reduce area size."
         )
-    ]
+    )
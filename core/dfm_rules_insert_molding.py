@@ -1,18 +1,20 @@
-from core.memory_types import DFMIssue
-from typing import List
+from functools import lru_cache
+from core.memory_types import DFMRule
+from typing import Tuple
 
-def dfm_rules_insert_molding() -> List[DFMIssue]:
-    return [
-        DFMIssue(
+@lru_cache(maxsize=None)
+def dfm_rules_insert_molding() -> Tuple[DFMRule, ...]:
+    return (
+        DFMRule(
             issue_type="Floating Insert",
             description="Insert not properly located can shift during molding.",
             severity="high",
             suggested_fix="Add locating features like ribs, slots, or flat surfaces."
         ),
-        DFMIssue(
+        DFMRule(
             issue_type="Thermal Mismatch",
             description="Insert material and plastic have different thermal expansion, which may cause stress.",
             severity="medium",
             suggested_fix="Use compatible materials or adjust geometry to compensate."
         )
-    ]
+    )
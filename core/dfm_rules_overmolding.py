@@ -1,18 +1,20 @@
-from core.memory_types import DFMIssue
-from typing import List
+from functools import lru_cache
+from core.memory_types import DFMRule
+from typing import Tuple
 
-def dfm_rules_overmolding() -> List[DFMIssue]:
-    return [
-        DFMIssue(
+@lru_cache(maxsize=None)
+def dfm_rules_overmolding() -> Tuple[DFMRule, ...]:
+    return (
+        DFMRule(
             issue_type="Low Bond Surface Area",
             description="Small interface between materials may cause delamination.",
             severity="high",
             suggested_fix="Increase overlap or add mechanical interlocks."
         ),
-        DFMIssue(
+        DFMRule(
             issue_type="Undercuts on First Shot",
             description="Undercuts in base part can trap the second shot or complicate tooling.",
             severity="medium",
             suggested_fix="Avoid or simplify undercuts."
         )
-    ]
+    )
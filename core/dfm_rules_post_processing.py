@@ -1,18 +1,20 @@
-from core.memory_types import DFMIssue
-from typing import List
+from functools import lru_cache
+from core.memory_types import DFMRule
+from typing import Tuple
 
-def dfm_rules_post_processing() -> List[DFMIssue]:
-    return [
-        DFMIssue(
+@lru_cache(maxsize=None)
+def dfm_rules_post_processing() -> Tuple[DFMRule, ...]:
+    return (
+        DFMRule(
             issue_type="Polishing Difficult Area",
             description="Tight or internal geometries are hard to polish or deburr.",
             severity="low",
             suggested_fix="Simplify or open geometry for accessibility."
         ),
-        DFMIssue(
+        DFMRule(
             issue_type="Sharp Edge",
             description="Sharp external edges increase post-processing time and safety risk.",
             severity="medium",
             suggested_fix="Use 0.5–1mm chamfer or fillet."
         )
-    ]
+    )
@@ -1,18 +1,20 @@
-from core.memory_types import DFMIssue
-from typing import List
+from functools import lru_cache
+from core.memory_types import DFMRule
+from typing import Tuple
 
-def dfm_rules_turning() -> List[DFMIssue]:
-    return [
-        DFMIssue(
+@lru_cache(maxsize=None)
+def dfm_rules_turning() -> Tuple[DFMRule, ...]:
+    return (
+        DFMRule(
             issue_type="Deep Groove or Undercut",
             description="Deep grooves may require special tools or result in chatter.",
             severity="medium",
             suggested_fix="Reduce groove depth or use standard radii."
         ),
-        DFMIssue(
+        DFMRule(
             issue_type="Unchuckable Geometry",
             description="Part shape may not fit standard lathe chuck.",
             severity="high",
             suggested_fix="Redesign ends or provide gripping features."
         )
-    ]
+    )
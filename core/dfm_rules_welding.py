@@ -1,18 +1,20 @@
-from core.memory_types import DFMIssue
-from typing import List
+from functools import lru_cache
+from core.memory_types import DFMRule
+from typing import Tuple
 
-def dfm_rules_welding() -> List[DFMIssue]:
-    return [
-        DFMIssue(
+@lru_cache(maxsize=None)
+def dfm_rules_welding() -> Tuple[DFMRule, ...]:
+    return (
+        DFMRule(
             issue_type="Gap Too Wide",
             description="Weld gap >1mm can cause weak joints or filler issues.",
             severity="high",
             suggested_fix="Ensure mating parts have consistent, tight-fitting edges."
         ),
-        DFMIssue(
+        DFMRule(
             issue_type="Inaccessible Weld Zone",
             description="Some weld joints are located in hard-to-reach areas.",
             severity="medium",
             suggested_fix="Reorient parts or simplify geometry for welder access."
         )
-    ]
+    )
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+
+_stats_lock = threading.Lock()
+_lock_stats: Dict[str, Dict[str, float]] = {}
+_thread_locks: Dict[str, threading.Lock] = {}
+
+# The process umask, read once: os.umask() can only be read by setting it, which races other threads.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _record_wait(metric: str, waited: float):
+    with _stats_lock:
+        stats = _lock_stats.setdefault(metric, {
+            "acquisitions": 0,
+            "contended": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0
+        })
+        waited_ms = waited * 1000
+        stats["acquisitions"] += 1
+        stats["total_wait_ms"] += waited_ms
+        stats["max_wait_ms"] = max(stats["max_wait_ms"], waited_ms)
+        if waited_ms >= 1:
+            stats["contended"] += 1
+
+
+def lock_wait_stats() -> Dict[str, Dict[str, float]]:
+    """Per-metric lock acquisition counts and wait times for this process."""
+    with _stats_lock:
+        return {name: dict(stats) for name, stats in _lock_stats.items()}
+
+
+@contextmanager
+def locked(path: Path, metric: str = "default"):
+    """
+    Exclusive cross-process advisory lock for `path`, held on a `<path>.lock` sidecar
+    so the data file itself can be replaced atomically while the lock is held.
+    Time spent waiting is recorded under `metric`.
+    """
+    path = Path(path)
+    lock_path = path.with_name(path.name + ".lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    started = time.monotonic()
+    if fcntl is None:
+        with _stats_lock:
+            thread_lock = _thread_locks.setdefault(str(lock_path), threading.Lock())
+        with thread_lock:
+            _record_wait(metric, time.monotonic() - started)
+            yield
+        return
+    with open(lock_path, "a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        _record_wait(metric, time.monotonic() - started)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def match_mode(fd: int, path: Path):
+    """
+    Gives a mkstemp() file (always 0600) the mode `path` has, or the mode a newly created
+    file would get, before it is renamed over `path`.
+    """
+    if not hasattr(os, "fchmod"):  # Windows: modes do not apply
+        return
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    os.fchmod(fd, mode)
+
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """Writes to a temp file in the same directory, fsyncs it and renames it over `path`."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            match_mode(f.fileno(), path)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def atomic_write_text(path: Path, text: str):
+    atomic_write_bytes(path, text.encode("utf-8"))
@@ -2,7 +2,7 @@ from core.memory_store import get_part_memory
 from typing import Dict
 
 def generate_handoff_guide(part_id: str) -> Dict:
-    memory = get_part_memory(part_id)
+    memory = get_part_memory(part_id, heavy_fields=())
     if not memory:
         return {"error": "Part not found"}
 
@@ -0,0 +1,111 @@
+import copy
+from typing import Any, List
+
+
+class JsonPatchError(ValueError):
+    pass
+
+
+def parse_pointer(pointer: str) -> List[str]:
+    """Splits an RFC 6901 JSON pointer into unescaped reference tokens."""
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _index(container: list, token: str, allow_end: bool = False) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise JsonPatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"Array index out of range: {index}")
+    return index
+
+
+def _parent(doc: Any, tokens: List[str]) -> Any:
+    target = doc
+    for token in tokens[:-1]:
+        if isinstance(target, list):
+            target = target[_index(target, token)]
+        elif isinstance(target, dict) and token in target:
+            target = target[token]
+        else:
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+    return target
+
+
+def _get(doc: Any, tokens: List[str]) -> Any:
+    if not tokens:
+        return doc
+    parent = _parent(doc, tokens)
+    if isinstance(parent, list):
+        return parent[_index(parent, tokens[-1])]
+    if isinstance(parent, dict) and tokens[-1] in parent:
+        return parent[tokens[-1]]
+    raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+
+
+def _add(doc: Any, tokens: List[str], value: Any) -> Any:
+    if not tokens:
+        return value
+    parent = _parent(doc, tokens)
+    if isinstance(parent, list):
+        parent.insert(_index(parent, tokens[-1], allow_end=True), value)
+    elif isinstance(parent, dict):
+        parent[tokens[-1]] = value
+    else:
+        raise JsonPatchError(f"Cannot add to a scalar at /{'/'.join(tokens)}")
+    return doc
+
+
+def _remove(doc: Any, tokens: List[str]) -> Any:
+    if not tokens:
+        raise JsonPatchError("Cannot remove the whole document")
+    parent = _parent(doc, tokens)
+    if isinstance(parent, list):
+        return parent.pop(_index(parent, tokens[-1]))
+    if isinstance(parent, dict) and tokens[-1] in parent:
+        return parent.pop(tokens[-1])
+    raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+
+
+def apply_patch(doc: Any, operations: List[dict]) -> Any:
+    """
+    Applies RFC 6902 operations (add, remove, replace, move, copy, test) to a copy of `doc`.
+    The patch is all-or-nothing: any failing operation raises JsonPatchError and `doc` is untouched.
+    """
+    doc = copy.deepcopy(doc)
+    for op in operations:
+        if not isinstance(op, dict) or "op" not in op or "path" not in op:
+            raise JsonPatchError(f"Malformed operation: {op!r}")
+        name = op["op"]
+        tokens = parse_pointer(op["path"])
+        if name in ("add", "replace", "test") and "value" not in op:
+            raise JsonPatchError(f"'{name}' requires a value")
+        if name in ("move", "copy") and "from" not in op:
+            raise JsonPatchError(f"'{name}' requires a from path")
+        if name == "add":
+            doc = _add(doc, tokens, copy.deepcopy(op["value"]))
+        elif name == "remove":
+            _remove(doc, tokens)
+        elif name == "replace":
+            if tokens:
+                _remove(doc, tokens)
+            doc = _add(doc, tokens, copy.deepcopy(op["value"]))
+        elif name == "move":
+            source = parse_pointer(op["from"])
+            if tokens[:len(source)] == source and tokens != source:
+                raise JsonPatchError("Cannot move a value into one of its own children")
+            doc = _add(doc, tokens, _remove(doc, source))
+        elif name == "copy":
+            doc = _add(doc, tokens, copy.deepcopy(_get(doc, parse_pointer(op["from"]))))
+        elif name == "test":
+            if _get(doc, tokens) != op["value"]:
+                raise JsonPatchError(f"Test failed at {op['path']}")
+        else:
+            raise JsonPatchError(f"Unknown operation: {name!r}")
+    return doc
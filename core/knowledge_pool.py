@@ -0,0 +1,12 @@
+from pathlib import Path
+from typing import Dict, Iterable
+from core.log_writer import JsonlFile, writer
+
+# Read line by line by search_engine, memory_gpt_wrapper and the ingestion scripts, so it stays one plain JSONL file.
+KNOWLEDGE_POOL_PATH = Path("axis5_knowledge_pool.jsonl")
+
+knowledge_pool = JsonlFile(KNOWLEDGE_POOL_PATH, "knowledge_pool")
+
+def append_knowledge(entries: Iterable[Dict], durability: str = "write"):
+    """Appends knowledge entries through the shared log writer."""
+    writer.submit_many(knowledge_pool, entries, durability)
@@ -1,26 +1,43 @@
-import json
+import sqlite3
 from pathlib import Path
-from typing import List, Dict
+from typing import Iterator, List, Dict, Optional
+from core.append_log import AppendLog
+from core.log_writer import writer
 
-LOG_PATH = Path("data/learning_log.json")
+LOG_DIR = Path("data/learning_log")
+LEGACY_LOG_PATHS = [Path("data/learning_log.jsonl"), Path("data/learning_log.json")]
+
+# Indexed by part_id, so per-part history reads only that part's lines.
+_log = AppendLog(LOG_DIR, "learning_log", legacy_paths=LEGACY_LOG_PATHS, index_key=lambda entry: entry.get("part_id"))
 
 def load_logs() -> List[Dict]:
     try:
-        if LOG_PATH.exists():
-            return json.loads(LOG_PATH.read_text())
-    except (OSError, json.JSONDecodeError) as e:
+        return _log.read_all()
+    except (OSError, ValueError) as e:
         print(f"[LearningLog] Error loading logs: {e}")
     return []
 
+def iter_logs(since: Optional[str] = None, until: Optional[str] = None) -> Iterator[Dict]:
+    """Streams log entries in log order, optionally only those timestamped within [since, until]."""
+    return _log.iter_entries(since, until)
+
 def save_logs(logs: List[Dict]):
     try:
-        LOG_PATH.write_text(json.dumps(logs, indent=2))
+        _log.rewrite(logs)
     except OSError as e:
         print(f"[LearningLog] Error saving logs: {e}")
 
+def append_log(entry: Dict):
+    try:
+        writer.submit(_log, entry)
+    except (OSError, ValueError) as e:
+        print(f"[LearningLog] Error appending log: {e}")
+
+def convert_legacy_log() -> int:
+    return _log.convert_legacy()
+
 def log_scenario_try(part_id: str, process: str, material: str, score: int, cost: float, applied: bool):
-    logs = load_logs()
-    logs.append({
+    append_log({
         "part_id": part_id,
         "type": "scenario_try",
         "process": process,
@@ -30,21 +47,25 @@ def log_scenario_try(part_id: str, process: str, material: str, score: int, cost
         "applied": applied,
         "timestamp": __import__('datetime').datetime.now().isoformat()
     })
-    save_logs(logs)
+
+def _part_logs(part_id: str, since: Optional[str] = None, until: Optional[str] = None) -> List[Dict]:
+    try:
+        return _log.read_key(part_id, since, until)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"[LearningLog] Error reading logs for {part_id}: {e}")
+    return []
 
 def get_scenario_history(part_id: str):
-    return [log for log in load_logs() if log.get("type") == "scenario_try" and log["part_id"] == part_id]
+    return [log for log in _part_logs(part_id) if log.get("type") == "scenario_try"]
 
 def log_action(part_id: str, action_type: str, details: str, user_id: str = "anonymous"):
-    logs = load_logs()
-    logs.append({
+    append_log({
         "part_id": part_id,
         "action_type": action_type,
         "details": details,
         "user_id": user_id,
         "timestamp": __import__('datetime').datetime.now().isoformat()
     })
-    save_logs(logs)
 
 def log_v2_acceptance(part_id: str, summary: str):
     log_action(
@@ -53,5 +74,6 @@ def log_v2_acceptance(part_id: str, summary: str):
         f"V2 accepted: {summary}"
     )
 
-def get_logs_for_part(part_id: str) -> List[Dict]:
-    return [log for log in load_logs() if log["part_id"] == part_id]
+def get_logs_for_part(part_id: str, since: Optional[str] = None, until: Optional[str] = None) -> List[Dict]:
+    """A part's log entries, optionally only those timestamped within [since, until]."""
+    return _part_logs(part_id, since, until)
@@ -1,21 +1,56 @@
+import base64
+import binascii
+import os
+import sqlite3
+import threading
 import uuid
-import json
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Callable, Iterable, Iterator, List, Dict, Any, Optional, Tuple
+from core.append_log import AppendLog, in_range
+from core.log_rollups import feedback_rows, rollups
+from core.log_writer import writer
 
-LOG_PATH = Path("data/learning_log_v2.json")
+LOG_DIR = Path("data/learning_log_v2")
+LEGACY_LOG_PATHS = [Path("data/learning_log_v2.jsonl"), Path("data/learning_log_v2.json")]
+# Update records a worker appends before it folds them into their entries in the background.
+COMPACT_AFTER_UPDATES = int(os.getenv("AXIS5_FEEDBACK_COMPACT_AFTER", "500"))
+# Entries read before their updates are looked up in the index, when streaming them in pages.
+FOLD_CHUNK = 100
+
+# Entries and their update records share the entry id as index key, so one entry is a handful of seeks.
+# Writes wait at least until they are in the log: updates look up the entry they change.
+_log = AppendLog(LOG_DIR, "learning_log_v2", legacy_paths=LEGACY_LOG_PATHS, index_key=lambda record: record.get("id"))
+_updates_since_compaction = 0
+_compaction_running = threading.Lock()
+
+# Keys of update records, which an update must not write into an entry.
+RESERVED_KEYS = ("id", "op", "updates")
+
+def _is_update(record: Dict[str, Any]) -> bool:
+    # Anything else is kept as an entry, so a malformed record is never folded away.
+    return record.get("op") == "update" and record.get("id") is not None and isinstance(record.get("updates"), dict)
+
+def _fold(records: Iterator[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Applies update records to the entries they target, keeping log order."""
+    entries = []
+    by_id = {}
+    for record in records:
+        if _is_update(record):
+            if record["id"] in by_id:
+                by_id[record["id"]].update(record["updates"])
+            continue
+        entries.append(record)
+        if "id" in record:
+            by_id[record["id"]] = record
+    return entries
 
 def load_logs() -> List[Dict[str, Any]]:
-    if not LOG_PATH.exists():
-        return []
-    return json.loads(LOG_PATH.read_text())
+    return _fold(iter(_log))
 
 def save_logs(logs: List[Dict[str, Any]]):
-    LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
-    LOG_PATH.write_text(json.dumps(logs, indent=2))
+    _log.rewrite(logs)
 
 def add_feedback_entry(module: str, partId: str, decision: str, reason: str = None, confidenceScore: float = None, userRole: str = None, metadata: Dict[str, Any] = None):
-    logs = load_logs()
     entry = {
         "id": str(uuid.uuid4()),
         "module": module,
@@ -27,18 +62,162 @@ def add_feedback_entry(module: str, partId: str, decision: str, reason: str = No
         "timestamp": __import__('datetime').datetime.now().isoformat(),
         "metadata": metadata or {}
     }
-    logs.append(entry)
-    save_logs(logs)
+    with rollups.transaction() as conn:
+        writer.submit(_log, entry, minimum="write")
+        rollups.apply(conn, feedback_rows(entry))
     return entry
 
-def get_all_feedback_logs() -> List[Dict[str, Any]]:
-    return load_logs()
+def get_all_feedback_logs(since: Optional[str] = None, until: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Feedback entries, optionally only those timestamped within [since, until]."""
+    if since is None and until is None:
+        return load_logs()
+    # Updates are always newer than their entry, so segments before `since` can be skipped entirely.
+    entries = _fold(_log.iter_entries(since=since))
+    return [entry for entry in entries if in_range(entry.get("timestamp"), since, until)]
+
+def iter_feedback_entries(since: Optional[str] = None, until: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Streams feedback entries with their updates applied, optionally only those timestamped
+    within [since, until].
+    """
+    for _, entry in iter_feedback_positions(since, until):
+        yield entry
+
+def iter_feedback_positions(since: Optional[str] = None, until: Optional[str] = None,
+                            after: Optional[Tuple[str, int]] = None) -> Iterator[Tuple[Tuple[str, int], Dict[str, Any]]]:
+    """
+    Like iter_feedback_entries, with each entry's position: its segment and its ordinal
+    among that segment's entries. Compaction only removes update records, so positions
+    stay valid and make stable cursors; `after` resumes just past one, reading nothing
+    before its segment. Entries are read FOLD_CHUNK at a time and only their own updates
+    are looked up, through the id index, so a page costs the same however much log
+    follows it.
+    """
+    start = after[0] if after is not None else None
+    chunk = []
+    segment, ordinal = None, 0
+    for name, record in _log.iter_segments(since, until, start):
+        if _is_update(record):
+            continue
+        if name != segment:
+            segment, ordinal = name, 0
+        position = (name, ordinal)
+        ordinal += 1
+        if after is not None and position <= after:
+            continue
+        if not in_range(record.get("timestamp"), since, until):
+            continue
+        chunk.append((position, record))
+        if len(chunk) >= FOLD_CHUNK:
+            yield from _with_updates(chunk)
+            chunk = []
+    yield from _with_updates(chunk)
+
+def _with_updates(chunk: List[Tuple[Tuple[str, int], Dict[str, Any]]]) -> Iterator[Tuple[Tuple[str, int], Dict[str, Any]]]:
+    # An entry with more than one record under its id in the index has update records.
+    counts = _log.key_counts([record["id"] for _, record in chunk if record.get("id") is not None])
+    for position, record in chunk:
+        if counts.get(record.get("id"), 0) > 1:
+            folded = _fold(iter(_log.read_key(record["id"])))
+            if folded:
+                record = folded[0]
+        yield position, record
+
+def query_feedback(since: Optional[str] = None, until: Optional[str] = None, cursor: Optional[str] = None,
+                   **filters: Optional[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Streams (cursor, entry) pairs for the feedback entries matching every given filter
+    (module, partId, decision, userRole) and the time range, in log order. Passing an
+    entry's cursor back resumes right after it. Raises ValueError for a malformed cursor.
+    """
+    filters = {field: value for field, value in filters.items() if value is not None}
+    for position, entry in iter_feedback_positions(since, until, decode_feedback_cursor(cursor)):
+        if all(entry.get(field) == value for field, value in filters.items()):
+            yield encode_feedback_cursor(position), entry
+
+def list_feedback(limit: int = 100, cursor: Optional[str] = None, **query: Optional[str]) -> Dict[str, Any]:
+    """One page of query_feedback(); pass next_cursor back for the next page (None after the last)."""
+    entries = []
+    last = None
+    for position, entry in query_feedback(cursor=cursor, **query):
+        if len(entries) == limit:
+            return {"entries": entries, "next_cursor": last}
+        entries.append(entry)
+        last = position
+    return {"entries": entries, "next_cursor": None}
+
+def encode_feedback_cursor(position: Tuple[str, int]) -> str:
+    return base64.urlsafe_b64encode(f"{position[0]}:{position[1]}".encode("utf-8")).decode()
+
+def decode_feedback_cursor(cursor: Optional[str]) -> Optional[Tuple[str, int]]:
+    if not cursor:
+        return None
+    try:
+        segment, ordinal = base64.urlsafe_b64decode(cursor.encode()).decode("utf-8").rsplit(":", 1)
+        return segment, int(ordinal)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+def get_feedback_entry(entry_id: str) -> Optional[Dict[str, Any]]:
+    entries = _fold(iter(_log.read_key(entry_id)))
+    return entries[0] if entries else None
 
 def update_feedback_entry(entry_id: str, updates: Dict[str, Any]):
-    logs = load_logs()
-    for entry in logs:
-        if entry["id"] == entry_id:
-            entry.update(updates)
-            break
-    save_logs(logs)
+    # The id is the index key, and "op"/"updates" would turn the folded entry into an update record.
+    updates = {k: v for k, v in updates.items() if k not in RESERVED_KEYS}
+    # The rollup transaction also keeps concurrent updates of the entry from racing each other.
+    with rollups.transaction() as conn:
+        entry = get_feedback_entry(entry_id)
+        if entry is None:
+            return entry_id
+        writer.submit(_log, {
+            "op": "update",
+            "id": entry_id,
+            "updates": updates,
+            "timestamp": __import__('datetime').datetime.now().isoformat()
+        }, minimum="write")
+        rollups.apply(conn, feedback_rows(entry), -1)
+        rollups.apply(conn, feedback_rows({**entry, **updates}))
+    _note_update()
     return entry_id
+
+def _folded_segment(snapshot: Callable[..., Iterator[Tuple[str, Dict[str, Any]]]], segment: str,
+                    pending: Dict[str, Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    for _, record in snapshot([segment]):
+        if _is_update(record):
+            continue
+        if record.get("id") in pending:
+            record = {**record, **pending[record["id"]]}
+        yield record
+
+def _compact_records(snapshot: Callable[..., Iterator[Tuple[str, Dict[str, Any]]]]) -> Dict[str, Iterable[Dict[str, Any]]]:
+    # The first pass keeps only the (few) pending updates in memory. Only the segments holding
+    # updates or the entries they target are rewritten, each streamed through on its own.
+    pending = {}
+    segments = set()
+    for segment, record in snapshot():
+        if _is_update(record):
+            pending.setdefault(record["id"], {}).update(record["updates"])
+            segments.add(segment)
+    for entry_id in pending:
+        segments.update(_log.segments_for_key(entry_id))
+    return {segment: _folded_segment(snapshot, segment, pending) for segment in segments}
+
+def compact_feedback_log() -> bool:
+    """Folds update records into their entries. Safe to run while other workers read and write."""
+    return _log.compact(_compact_records)
+
+def _compact_in_background():
+    try:
+        compact_feedback_log()
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"[LearningLogV2] Compaction failed: {e}")
+    finally:
+        _compaction_running.release()
+
+def _note_update():
+    global _updates_since_compaction
+    _updates_since_compaction += 1
+    if _updates_since_compaction >= COMPACT_AFTER_UPDATES and _compaction_running.acquire(blocking=False):
+        _updates_since_compaction = 0
+        threading.Thread(target=_compact_in_background, name="feedback-log-compaction", daemon=True).start()
@@ -0,0 +1,228 @@
+import os
+import re
+import shutil
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from core import serializers
+from core.learning_log import iter_logs
+from core.learning_log_v2 import iter_feedback_entries
+from core.score_log import iter_score_logs
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+EXPORT_DIR = Path("data/exports")
+# Rows buffered per partition before they are written out; bounds memory however large the log.
+BATCH_ROWS = int(os.getenv("AXIS5_EXPORT_BATCH_ROWS", "10000"))
+# Partitions kept open at once; the least recently written is closed when another is needed.
+OPEN_PARTITIONS = int(os.getenv("AXIS5_EXPORT_OPEN_PARTITIONS", "64"))
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+class Column(NamedTuple):
+    name: str
+    kind: str  # "string", "float", "bool", "timestamp" or "json" (nested values as JSON text)
+
+
+class LogSource(NamedTuple):
+    columns: Tuple[Column, ...]
+    entries: Callable[[Optional[str], Optional[str]], Iterable[Dict]]
+    # Module an entry is partitioned under, or None to partition by day only.
+    module: Optional[Callable[[Dict], Any]] = None
+
+
+SOURCES = {
+    "learning_log": LogSource(
+        columns=(
+            Column("part_id", "string"),
+            Column("type", "string"),
+            Column("action_type", "string"),
+            Column("details", "string"),
+            Column("user_id", "string"),
+            Column("process", "string"),
+            Column("material", "string"),
+            Column("dfm_score", "float"),
+            Column("cost_per_part", "float"),
+            Column("applied", "bool"),
+            Column("timestamp", "timestamp"),
+        ),
+        entries=iter_logs,
+        # Scenario tries carry a type; everything else is a user action.
+        module=lambda entry: entry.get("type") or "action",
+    ),
+    "feedback": LogSource(
+        columns=(
+            Column("id", "string"),
+            Column("module", "string"),
+            Column("partId", "string"),
+            Column("decision", "string"),
+            Column("reason", "string"),
+            Column("confidenceScore", "float"),
+            Column("userRole", "string"),
+            Column("metadata", "json"),
+            Column("timestamp", "timestamp"),
+        ),
+        entries=iter_feedback_entries,
+        module=lambda entry: entry.get("module"),
+    ),
+    "score": LogSource(
+        columns=(
+            Column("partId", "string"),
+            Column("version", "string"),
+            Column("score", "float"),
+            Column("breakdown", "json"),
+            Column("timestamp", "timestamp"),
+        ),
+        entries=iter_score_logs,
+    ),
+}
+
+
+def _arrow_type(kind: str):
+    return {
+        "string": pyarrow.string(),
+        "json": pyarrow.string(),
+        "float": pyarrow.float64(),
+        "bool": pyarrow.bool_(),
+        "timestamp": pyarrow.timestamp("us"),
+    }[kind]
+
+
+def _timestamp(value) -> Optional[datetime]:
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _convert(kind: str, value):
+    if value is None:
+        return None
+    if kind == "string":
+        return value if isinstance(value, str) else str(value)
+    if kind == "float":
+        return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+    if kind == "bool":
+        return value if isinstance(value, bool) else None
+    if kind == "timestamp":
+        return _timestamp(value)
+    return serializers.dumps_json(value).decode("utf-8")
+
+
+def _partition_value(value) -> str:
+    return _UNSAFE.sub("_", str(value)) if value not in (None, "") else "unknown"
+
+
+class _Partition:
+    """One day/module directory; rows are written out a batch at a time."""
+
+    def __init__(self, directory: Path, source: LogSource, schema, fmt: str):
+        self.directory = directory
+        self.source = source
+        self.schema = schema
+        self.fmt = fmt
+        self.rows: Dict[str, List[Any]] = {column.name: [] for column in source.columns}
+        self.files = 0
+        self._writer = None
+        self._sink = None
+
+    def add(self, entry: Dict):
+        for column in self.source.columns:
+            self.rows[column.name].append(_convert(column.kind, entry.get(column.name)))
+        if len(self.rows[self.source.columns[0].name]) >= BATCH_ROWS:
+            self.flush()
+
+    def flush(self):
+        if not self.rows[self.source.columns[0].name]:
+            return
+        if self._writer is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # A partition reopened by an out-of-order entry gets another file rather than overwriting.
+            path = self.directory / f"part-{uuid.uuid4().hex[:8]}{FORMATS[self.fmt]}"
+            if self.fmt == "parquet":
+                self._writer = pyarrow.parquet.ParquetWriter(str(path), self.schema)
+            else:
+                self._sink = pyarrow.OSFile(str(path), "wb")
+                self._writer = pyarrow.ipc.new_file(self._sink, self.schema)
+            self.files += 1
+        self._writer.write_table(pyarrow.Table.from_pydict(self.rows, schema=self.schema))
+        self.rows = {column.name: [] for column in self.source.columns}
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+
+def export_log(log: str, fmt: str = "parquet", since: Optional[str] = None, until: Optional[str] = None,
+               out_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Streams a log into Parquet (or Arrow IPC) files with typed columns, partitioned Hive
+    style as <out_dir>/day=YYYY-MM-DD/module=<module>/part-*.parquet, so analysis jobs can
+    read single partitions and columns. The export is written next to `out_dir`
+    (default data/exports/<log>) and replaces it only once complete.
+    """
+    if pyarrow is None:
+        raise RuntimeError("Exporting logs requires the pyarrow package")
+    if log not in SOURCES:
+        raise ValueError(f"Unknown log: {log}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    source = SOURCES[log]
+    out_dir = Path(out_dir) if out_dir is not None else EXPORT_DIR / log
+    out_dir.parent.mkdir(parents=True, exist_ok=True)
+    staging = out_dir.with_name(f".{out_dir.name}.{uuid.uuid4().hex[:8]}.tmp")
+    schema = pyarrow.schema([(column.name, _arrow_type(column.kind)) for column in source.columns])
+
+    # Logs are mostly in time order, so the partitions still being written are the recent ones;
+    # entries out of order or without a timestamp find theirs open too, instead of a new file each.
+    partitions: "OrderedDict[Tuple[str, Optional[str]], _Partition]" = OrderedDict()
+    rows = 0
+    files = 0
+    try:
+        for entry in source.entries(since, until):
+            timestamp = _timestamp(entry.get("timestamp"))
+            day = timestamp.strftime("%Y-%m-%d") if timestamp is not None else "unknown"
+            module = _partition_value(source.module(entry)) if source.module is not None else None
+            partition = partitions.get((day, module))
+            if partition is None:
+                if len(partitions) >= max(OPEN_PARTITIONS, 1):
+                    _, evicted = partitions.popitem(last=False)
+                    evicted.close()
+                    files += evicted.files
+                directory = staging / f"day={day}"
+                if module is not None:
+                    directory = directory / f"module={module}"
+                partition = partitions[(day, module)] = _Partition(directory, source, schema, fmt)
+            else:
+                partitions.move_to_end((day, module))
+            partition.add(entry)
+            rows += 1
+        for partition in partitions.values():
+            partition.close()
+            files += partition.files
+        staging.mkdir(parents=True, exist_ok=True)
+        retired = out_dir.with_name(f".{out_dir.name}.{uuid.uuid4().hex[:8]}.old")
+        if out_dir.exists():
+            os.replace(out_dir, retired)
+        os.replace(staging, out_dir)
+        shutil.rmtree(retired, ignore_errors=True)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return {"log": log, "format": fmt, "path": str(out_dir), "rows": rows, "files": files}
@@ -0,0 +1,191 @@
+import math
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from core import serializers
+from core.memory_backends import SQLiteConnections
+
+ROLLUPS_PATH = Path("data/log_rollups.sqlite")
+
+# (rollup name, key parts, value added to the rollup's sum)
+RollupRow = Tuple[str, Tuple[Any, ...], float]
+
+
+def _day(entry: Dict) -> Optional[str]:
+    timestamp = entry.get("timestamp")
+    return timestamp[:10] if isinstance(timestamp, str) else None
+
+
+def _number(value) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or math.isnan(value):
+        return None
+    return float(value)
+
+
+def feedback_rows(entry: Dict) -> List[RollupRow]:
+    """What one (folded) feedback entry contributes to the rollups."""
+    module, part_id, decision = entry.get("module"), entry.get("partId"), entry.get("decision")
+    rows = [
+        ("feedback.by_module", (module,), 0.0),
+        ("feedback.by_part", (part_id,), 0.0),
+        ("feedback.by_decision", (decision,), 0.0),
+        ("feedback.by_day", (_day(entry),), 0.0),
+        ("feedback.by_module_decision", (module, decision), 0.0),
+        ("feedback.by_part_decision", (part_id, decision), 0.0),
+        ("feedback.by_day_decision", (_day(entry), decision), 0.0),
+    ]
+    confidence = _number(entry.get("confidenceScore"))
+    if confidence is not None:
+        rows += [
+            ("feedback.confidence_by_role", (entry.get("userRole"),), confidence),
+            ("feedback.confidence_by_module", (module,), confidence),
+            ("feedback.confidence_histogram", (math.floor(confidence * 10) / 10,), confidence),
+        ]
+    return rows
+
+
+def score_rows(entry: Dict) -> List[RollupRow]:
+    """What one score event contributes to the rollups."""
+    if not isinstance(entry, dict):
+        return []
+    score = _number(entry.get("score"))
+    if score is None:
+        return [("score.invalid", (None,), 0.0)]
+    part_id = entry.get("partId")
+    return [
+        ("score.by_part", (part_id,), score),
+        ("score.by_day", (_day(entry),), score),
+        ("score.by_part_day", (part_id, _day(entry)), score),
+        ("score.histogram", (int(score // 10) * 10,), score),
+    ]
+
+
+class RollupStore:
+    """
+    Counts and sums of log entries grouped by module, part, decision, day, ..., kept in
+    SQLite and updated by every log write, so reading them costs the same however long
+    the logs get. Each rollup row holds a count and the sum of a value (confidence,
+    score) over the entries in its group; averages are sum / count.
+    """
+
+    def __init__(self, path: Path):
+        self._connections = SQLiteConnections(path, self._create_schema)
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection):
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rollups (name TEXT NOT NULL, key TEXT NOT NULL, "
+                "count INTEGER NOT NULL, total REAL NOT NULL, PRIMARY KEY (name, key))"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        A write transaction, taken before anything else so concurrent read-modify-write
+        updates (e.g. of one feedback entry) are serialized across processes.
+        """
+        conn = self._connections.get()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    @staticmethod
+    def apply(conn: sqlite3.Connection, rows: Iterable[RollupRow], sign: int = 1):
+        rows = [(name, serializers.dumps_json(list(key)).decode("utf-8"), value) for name, key, value in rows]
+        conn.executemany(
+            "INSERT INTO rollups (name, key, count, total) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (name, key) DO UPDATE SET count = count + excluded.count, total = total + excluded.total",
+            [(name, key, sign, sign * value) for name, key, value in rows]
+        )
+        if sign < 0:
+            conn.executemany(
+                "DELETE FROM rollups WHERE name = ? AND key = ? AND count <= 0", [(name, key) for name, key, _ in rows]
+            )
+
+    def is_built(self) -> bool:
+        row = self._connections.get().execute("SELECT value FROM meta WHERE key = 'built_at'").fetchone()
+        return row is not None
+
+    @staticmethod
+    def mark(conn: sqlite3.Connection, log: str) -> Optional[Tuple[str, int]]:
+        """How far into `log` (an AppendLog position) the last rebuild read, if its writes may still be pending."""
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (f"{log}.rebuilt_upto",)).fetchone()
+        return tuple(serializers.loads_json(row["value"])) if row is not None else None
+
+    @staticmethod
+    def set_mark(conn: sqlite3.Connection, log: str, position: Optional[Tuple[str, int]]):
+        if position is None:
+            conn.execute("DELETE FROM meta WHERE key = ?", (f"{log}.rebuilt_upto",))
+        else:
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (f"{log}.rebuilt_upto", serializers.dumps_json(list(position)).decode("utf-8"))
+            )
+
+    def rebuild(self, feedback_entries: Callable[[], Iterable[Dict]],
+                score_end: Callable[[], Optional[Tuple[str, int]]],
+                score_entries: Callable[[Optional[Tuple[str, int]]], Iterable[Dict]]):
+        """
+        Recomputes every rollup from the logs, e.g. after a crash between a log write and
+        its rollup update. The logs are read inside the transaction, so feedback written
+        meanwhile is counted exactly once. Score batches are counted by the log writer's
+        callback after they are written, so the rebuild reads the score log only up to
+        where it ends now and leaves that position in `meta`; the callback skips batches
+        at or before it.
+        """
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM rollups")
+            for entry in feedback_entries():
+                self.apply(conn, feedback_rows(entry))
+            upto = score_end()
+            if upto is not None:
+                for entry in score_entries(upto):
+                    self.apply(conn, score_rows(entry))
+            self.set_mark(conn, "score_log", upto)
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('built_at', ?)", (datetime.utcnow().isoformat(),)
+            )
+
+    def read(self, name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        {rollup name: {key: {"count", "sum"}}}; rollups over several fields nest one level
+        per field, e.g. result["feedback.by_module_decision"]["dfm"]["accept"].
+        """
+        conn = self._connections.get()
+        if name is None:
+            rows = conn.execute("SELECT name, key, count, total FROM rollups ORDER BY name, key")
+        else:
+            rows = conn.execute("SELECT name, key, count, total FROM rollups WHERE name = ? ORDER BY key", (name,))
+        result: Dict[str, Any] = {}
+        for row in rows:
+            node = result.setdefault(row["name"], {})
+            *path, last = ["unknown" if part is None else str(part) for part in serializers.loads_json(row["key"])]
+            for part in path:
+                node = node.setdefault(part, {})
+            node[last] = {"count": row["count"], "sum": row["total"]}
+        return result
+
+
+rollups = RollupStore(ROLLUPS_PATH)
+
+
+def rebuild_rollups():
+    # Imported here: both logs update the rollups as they are written.
+    from core.learning_log_v2 import load_logs
+    from core.score_log import iter_score_logs, score_log_end
+    rollups.rebuild(load_logs, score_log_end, lambda upto: iter_score_logs(upto=upto))
+
+
+def get_rollups(name: Optional[str] = None) -> Dict[str, Any]:
+    """The rollups, built from the existing logs the first time they are asked for."""
+    if not rollups.is_built():
+        rebuild_rollups()
+    return rollups.read(name)
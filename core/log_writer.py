@@ -0,0 +1,229 @@
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from core.append_log import encode_line
+from core.file_locks import locked
+
+# How long a write call waits: "none" (it returns at once; the record is written with the next
+# batch), "write" (until its batch has been written) or "fsync" (until that batch is on disk).
+DURABILITY_LEVELS = ("none", "write", "fsync")
+# When set, overrides every log's own durability level (except where a log needs at least "write").
+DURABILITY = os.getenv("AXIS5_LOG_DURABILITY")
+# Queued records are written once this many are waiting, or after this many seconds.
+FLUSH_SIZE = int(os.getenv("AXIS5_LOG_FLUSH_SIZE", "100"))
+FLUSH_INTERVAL = float(os.getenv("AXIS5_LOG_FLUSH_INTERVAL", "1.0"))
+
+
+class JsonlFile:
+    """A plain JSONL file that other tools read directly, as a LogWriter target."""
+
+    def __init__(self, path: Path, metric: str):
+        self.path = Path(path)
+        self.metric = metric
+
+    def append_many(self, entries: Iterable[Dict], durable: bool = False):
+        data = b"".join(encode_line(entry) for entry in entries)
+        with locked(self.path, self.metric):
+            with open(self.path, "ab") as f:
+                f.write(data)
+                if durable:
+                    f.flush()
+                    os.fsync(f.fileno())
+
+    def __str__(self) -> str:
+        return str(self.path)
+
+
+class _Waiter:
+    def __init__(self):
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+
+    def release(self, error: Optional[BaseException] = None):
+        self.error = error
+        self.done.set()
+
+
+class _Batch:
+    def __init__(self, target):
+        self.target = target
+        self.entries: List[Dict] = []
+        # Records whose callers are not waiting; they are retried if the write fails.
+        self.unwaited: List[Dict] = []
+        self.waiters: List[_Waiter] = []
+        self.durable = False
+
+
+class LogWriter:
+    """
+    One background thread that writes the records of every append-style log. Records
+    queue up per target (an AppendLog or a JsonlFile) and each target's batch is
+    written with a single append_many(), fsynced once when any caller in it asked for
+    "fsync": a group commit. Callers waiting for "write" or "fsync" wake the thread at
+    once, so concurrent writers share one open, write and fsync. flush(durable=True)
+    (run at application shutdown) and close() (run at interpreter exit) write and fsync
+    whatever is left; records queued with "none" are lost if the process is killed outright.
+    """
+
+    def __init__(self, flush_size: int, flush_interval: float):
+        self.flush_size = max(flush_size, 1)
+        self.flush_interval = flush_interval
+        self._pending: Dict[int, _Batch] = {}
+        self._count = 0
+        self._urgent = False
+        self._barriers: List[_Waiter] = []
+        self._sync = False
+        self._hooks: Dict[int, Callable[[List[Dict], Any], None]] = {}
+        self._hook_queue: "queue.Queue" = queue.Queue()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._hook_thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def on_write(self, target, callback: Callable[[List[Dict], Any], None]):
+        """
+        Calls `callback` with each batch once it is written to `target`, along with what
+        the target's append_many() returned (an AppendLog's position just past the batch).
+        Callbacks run in order on a thread of their own, so they may wait on locks held by
+        callers that are themselves waiting for a write.
+        """
+        self._hooks[id(target)] = callback
+
+    def submit(self, target, entry: Dict, durability: str = "write", minimum: str = "none"):
+        self.submit_many(target, [entry], durability, minimum)
+
+    def submit_many(self, target, entries: Iterable[Dict], durability: str = "write", minimum: str = "none"):
+        entries = list(entries)
+        level = max(DURABILITY or durability, minimum, key=DURABILITY_LEVELS.index)
+        waiter = _Waiter() if level != "none" else None
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Log writer is closed")
+            batch = self._batch(target)
+            batch.entries.extend(entries)
+            self._count += len(entries)
+            if waiter is None:
+                batch.unwaited.extend(entries)
+            else:
+                batch.waiters.append(waiter)
+                batch.durable = batch.durable or level == "fsync"
+                self._urgent = True
+            self._start()
+            if waiter is not None or self._count >= self.flush_size:
+                self._condition.notify()
+        if waiter is not None:
+            waiter.wait()
+
+    def flush(self, hooks: bool = False, durable: bool = False):
+        """
+        Returns once everything submitted so far has been written (and fsynced, with
+        `durable`) and, with `hooks`, once the on_write callbacks for it have run too.
+        The writer stays open for further records.
+        """
+        waiter = _Waiter()
+        with self._condition:
+            if self._thread is None or self._closed:
+                return
+            self._barriers.append(waiter)
+            self._urgent = True
+            self._sync = self._sync or durable
+            self._condition.notify()
+        waiter.wait()
+        if hooks and self._hook_thread is not None:
+            waiter = _Waiter()
+            self._hook_queue.put(waiter)
+            waiter.wait()
+
+    def close(self):
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+        if self._hook_thread is not None:
+            self._hook_queue.put(None)
+            self._hook_thread.join()
+
+    def _batch(self, target) -> _Batch:
+        batch = self._pending.get(id(target))
+        if batch is None:
+            batch = self._pending[id(target)] = _Batch(target)
+        return batch
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._closed and not self._urgent and self._count < self.flush_size:
+                    self._condition.wait(self.flush_interval)
+                batches = list(self._pending.values())
+                barriers = self._barriers
+                sync = self._sync or self._closed
+                self._pending, self._count, self._urgent, self._barriers, self._sync = {}, 0, False, [], False
+                closing = self._closed
+            for batch in batches:
+                # Nothing after close() will flush again, so the last batches go straight to disk.
+                self._write(batch, durable=batch.durable or sync, retry=not closing)
+            for barrier in barriers:
+                barrier.release()
+            if closing:
+                return
+
+    def _write(self, batch: _Batch, durable: bool, retry: bool):
+        try:
+            result = batch.target.append_many(batch.entries, durable=durable)
+        except Exception as e:
+            # Waiting callers get the error. The rest is retried with the next batch if the
+            # failure may be transient (I/O), and dropped if the records cannot be written at all.
+            print(f"[LogWriter] Could not write {batch.target}: {e}")
+            for waiter in batch.waiters:
+                waiter.release(e)
+            if retry and batch.unwaited and isinstance(e, (OSError, sqlite3.Error)):
+                with self._condition:
+                    retried = self._batch(batch.target)
+                    retried.entries[:0] = batch.unwaited
+                    retried.unwaited[:0] = batch.unwaited
+                    self._count += len(batch.unwaited)
+            return
+        for waiter in batch.waiters:
+            waiter.release()
+        hook = self._hooks.get(id(batch.target))
+        if hook is not None:
+            if self._hook_thread is None:
+                self._hook_thread = threading.Thread(target=self._run_hooks, name="log-writer-hooks", daemon=True)
+                self._hook_thread.start()
+            self._hook_queue.put((hook, batch.entries, result))
+
+    def _run_hooks(self):
+        while True:
+            item = self._hook_queue.get()
+            if item is None:
+                return
+            if isinstance(item, _Waiter):
+                item.release()
+                continue
+            hook, entries, result = item
+            # A failing callback must not stop the ones after it, nor strand flush(hooks=True).
+            try:
+                hook(entries, result)
+            except Exception as e:
+                print(f"[LogWriter] on_write callback failed: {e}")
+
+
+writer = LogWriter(FLUSH_SIZE, FLUSH_INTERVAL)
+atexit.register(writer.close)
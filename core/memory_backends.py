@@ -0,0 +1,740 @@
+import gzip
+import hashlib
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from core import serializers
+from core.file_locks import atomic_write_bytes, locked
+from core.record_index import RecordOffsetIndex, encode_json_with_offsets
+
+
+# Stay well below SQLite's host-parameter limit when expanding IN (...) lists.
+SQLITE_MAX_PARAMS = 500
+
+
+def chunked(items: List, size: int) -> Iterator[List]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def hashed_path(root: Path, part_id: str, suffix: str) -> Path:
+    """<root>/<first two hex chars>/<sha1 of part_id><suffix>, safe for any part_id."""
+    digest = hashlib.sha1(part_id.encode("utf-8")).hexdigest()
+    return root / digest[:2] / f"{digest}{suffix}"
+
+
+def file_signature(path: Path) -> Optional[tuple]:
+    """Cheap change marker for a file: (inode, mtime_ns, size), or None if it does not exist."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def plan_journal_sync(memory_log: List[dict], journal: List[dict]) -> Optional[Tuple[str, List[dict]]]:
+    """
+    Decides how to bring a journal in line with a full memory_log. New trailing entries are
+    appended; the journal is only rewritten when the log was edited rather than extended.
+    A journal that already extends memory_log (an append raced the save) is left alone.
+    """
+    if memory_log[:len(journal)] == journal:
+        if len(memory_log) > len(journal):
+            return ("append", memory_log[len(journal):])
+        return None
+    if journal[:len(memory_log)] != memory_log:
+        return ("rewrite", memory_log)
+    return None
+
+
+def _jsonl(entries: List[dict]) -> bytes:
+    return b"".join(serializers.dumps_json(e) + b"\n" for e in entries)
+
+
+class JsonlLogJournal:
+    """
+    Append-only memory_log journal: one JSONL file per part, one entry per line.
+    Appending a log entry is a single small write; the file is only rewritten
+    when a caller replaces the log wholesale or trims archived entries. A small
+    `.rev` file next to it holds a base that grows past the journal's size on
+    every such change, so revision() never goes backwards.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def path_for(self, part_id: str) -> Path:
+        return hashed_path(self.root, part_id, ".jsonl")
+
+    def signature(self, part_id: str) -> Optional[tuple]:
+        return file_signature(self.path_for(part_id))
+
+    def read(self, part_id: str) -> List[dict]:
+        path = self.path_for(part_id)
+        if not path.exists():
+            return []
+        with open(path, "rb") as f:
+            return [serializers.loads_json(line) for line in f if line.strip()]
+
+    def read_many(self, part_ids: List[str]) -> Dict[str, List[dict]]:
+        return {part_id: self.read(part_id) for part_id in part_ids}
+
+    def base_path_for(self, part_id: str) -> Path:
+        return hashed_path(self.root, part_id, ".rev")
+
+    def revision(self, part_id: str) -> int:
+        """Grows with every change: appends add their size, anything else (see bump) advances the base."""
+        signature = self.signature(part_id)
+        return self._base(part_id) + (signature[2] if signature else 0)
+
+    def bump(self, part_id: str):
+        """Advances the revision without changing the journal, e.g. when the part's chat_history is archived."""
+        with locked(self.path_for(part_id), "memory_journal"):
+            self._advance(part_id)
+
+    def append(self, part_id: str, entries: List[dict]):
+        path = self.path_for(part_id)
+        with locked(path, "memory_journal"):
+            self._append(path, entries)
+
+    def rewrite(self, part_id: str, entries: List[dict]):
+        path = self.path_for(part_id)
+        with locked(path, "memory_journal"):
+            self._advance(part_id)
+            atomic_write_bytes(path, _jsonl(entries))
+
+    def sync(self, part_id: str, memory_log: List[dict]):
+        path = self.path_for(part_id)
+        with locked(path, "memory_journal"):
+            plan = plan_journal_sync(memory_log, self.read(part_id))
+            if plan is None:
+                return
+            op, entries = plan
+            if op == "append":
+                self._append(path, entries)
+            else:
+                self._advance(part_id)
+                atomic_write_bytes(path, _jsonl(entries))
+
+    def trim(self, part_id: str, entries: List[dict]):
+        """Drops `entries` from the head of the journal once they are archived; appends since are kept."""
+        path = self.path_for(part_id)
+        with locked(path, "memory_journal"):
+            journal = self.read(part_id)
+            if journal[:len(entries)] == entries:
+                self._advance(part_id)
+                atomic_write_bytes(path, _jsonl(journal[len(entries):]))
+
+    def _append(self, path: Path, entries: List[dict]):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "ab") as f:
+            f.write(_jsonl(entries))
+
+    def _base(self, part_id: str) -> int:
+        try:
+            return int(self.base_path_for(part_id).read_bytes() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def _advance(self, part_id: str):
+        # Moves the base past the current revision before the journal changes: a reader
+        # catching the new base with the old file still sees a larger revision. Callers
+        # hold the journal's lock.
+        signature = self.signature(part_id)
+        base = self._base(part_id) + (signature[2] if signature else 0) + 1
+        atomic_write_bytes(self.base_path_for(part_id), str(base).encode())
+
+
+class FileSideFieldStore:
+    """
+    Heavy PartMemory fields (e.g. chat_history) kept out of the part record,
+    one file per part and field, so scalar-only reads never parse them.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def path_for(self, part_id: str, field: str) -> Path:
+        return hashed_path(self.root, part_id, f".{field}")
+
+    def signature(self, part_id: str, field: str) -> Optional[tuple]:
+        return file_signature(self.path_for(part_id, field))
+
+    def exists(self, part_id: str, field: str) -> bool:
+        return self.path_for(part_id, field).exists()
+
+    def read(self, part_id: str, field: str) -> Optional[Any]:
+        path = self.path_for(part_id, field)
+        if not path.exists():
+            return None
+        return serializers.loads(path.read_bytes())
+
+    def read_many(self, part_ids: List[str], field: str) -> Dict[str, Any]:
+        return {part_id: self.read(part_id, field) for part_id in part_ids}
+
+    def write(self, part_id: str, field: str, value: Any):
+        atomic_write_bytes(self.path_for(part_id, field), serializers.dumps(value))
+
+
+class FileArchiveStore:
+    """
+    Archived chat_history / memory_log entries: a directory per part and field holding
+    numbered, gzip-compressed segments. Segments are written once and never rewritten.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def dir_for(self, part_id: str, field: str) -> Path:
+        return hashed_path(self.root, part_id, f".{field}")
+
+    def segments(self, part_id: str, field: str) -> List[int]:
+        directory = self.dir_for(part_id, field)
+        if not directory.exists():
+            return []
+        return sorted(int(path.name.split(".")[0]) for path in directory.glob("*.json.gz"))
+
+    def read(self, part_id: str, field: str, seq: int) -> List[dict]:
+        path = self.dir_for(part_id, field) / f"{seq:08d}.json.gz"
+        if not path.exists():
+            return []
+        return serializers.loads(gzip.decompress(path.read_bytes()))
+
+    def append(self, part_id: str, field: str, entries: List[dict]):
+        directory = self.dir_for(part_id, field)
+        with locked(directory, "memory_archive"):
+            seq = max(self.segments(part_id, field), default=0) + 1
+            atomic_write_bytes(directory / f"{seq:08d}.json.gz", gzip.compress(serializers.dumps(entries)))
+
+
+class MonolithicMemoryStore:
+    """
+    Legacy layout: every part lives in a single JSON object keyed by part_id.
+    Each save re-reads and rewrites the whole file, holding the file lock throughout.
+    Reads go through a byte-offset index and decode only the records asked for.
+    """
+
+    def __init__(self, path: Path, journal_root: Path, side_root: Path, archive_root: Path):
+        self.path = Path(path)
+        self.journal = JsonlLogJournal(journal_root)
+        self.side = FileSideFieldStore(side_root)
+        self.archive = FileArchiveStore(archive_root)
+        self.index = RecordOffsetIndex.for_path(self.path)
+
+    def load_all(self) -> Dict[str, dict]:
+        if self.path.exists():
+            return serializers.loads(self.path.read_bytes())
+        return {}
+
+    def save_all(self, memory_data: Dict[str, dict]):
+        with locked(self.path, "memory_store"):
+            self._write(memory_data)
+
+    def _write(self, memory_data: Dict[str, dict]):
+        if serializers.STORAGE_FORMAT != "json":
+            atomic_write_bytes(self.path, serializers.dumps(memory_data))
+            return
+        # Offsets come for free while encoding, so the next read does not have to rescan.
+        data, offsets = encode_json_with_offsets(memory_data)
+        atomic_write_bytes(self.path, data)
+        signature = file_signature(self.path)
+        if signature is not None:
+            self.index.store(signature, offsets)
+
+    def signature(self, part_id: str) -> Optional[tuple]:
+        return file_signature(self.path)
+
+    def exists(self, part_id: str) -> bool:
+        return part_id in self.index
+
+    def load(self, part_id: str) -> Optional[dict]:
+        return self.index.read(part_id)
+
+    def save(self, part_id: str, record: dict):
+        self.save_many({part_id: record})
+
+    def load_many(self, part_ids: List[str]) -> Dict[str, dict]:
+        return self.index.read_many(part_ids)
+
+    def save_many(self, records: Dict[str, dict]):
+        with locked(self.path, "memory_store"):
+            data = self.load_all()
+            data.update(records)
+            self._write(data)
+
+    def iter_records(self) -> Iterator[dict]:
+        yield from self.index.iter_records()
+
+
+class ShardedMemoryStore:
+    """
+    One JSON file per part, spread over 256 hashed sub-directories so that no
+    single directory grows too large. Reads and writes touch only the part asked for.
+    """
+
+    def __init__(self, root: Path, journal_root: Path, side_root: Path, archive_root: Path):
+        self.root = Path(root)
+        self.journal = JsonlLogJournal(journal_root)
+        self.side = FileSideFieldStore(side_root)
+        self.archive = FileArchiveStore(archive_root)
+
+    def path_for(self, part_id: str) -> Path:
+        return hashed_path(self.root, part_id, ".json")
+
+    def signature(self, part_id: str) -> Optional[tuple]:
+        return file_signature(self.path_for(part_id))
+
+    def exists(self, part_id: str) -> bool:
+        return self.path_for(part_id).exists()
+
+    def load(self, part_id: str) -> Optional[dict]:
+        path = self.path_for(part_id)
+        if not path.exists():
+            return None
+        return serializers.loads(path.read_bytes())
+
+    def save(self, part_id: str, record: dict):
+        # A whole-record replace, so an atomic rename is enough; readers never see a partial file.
+        atomic_write_bytes(self.path_for(part_id), serializers.dumps(record))
+
+    def load_many(self, part_ids: List[str]) -> Dict[str, dict]:
+        records = {}
+        for part_id in part_ids:
+            record = self.load(part_id)
+            if record is not None:
+                records[part_id] = record
+        return records
+
+    def save_many(self, records: Dict[str, dict]):
+        for part_id, record in records.items():
+            self.save(part_id, record)
+
+    def iter_records(self) -> Iterator[dict]:
+        for path in sorted(self.root.glob("*/*.json")):
+            yield serializers.loads(path.read_bytes())
+
+
+class SQLiteConnections:
+    """One WAL-mode connection per thread to a SQLite file; `create_schema` runs on each new connection."""
+
+    def __init__(self, path: Path, create_schema: Callable[[sqlite3.Connection], None]):
+        self.path = Path(path)
+        self._create_schema = create_schema
+        self._local = threading.local()
+
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._create_schema(conn)
+            self._local.conn = conn
+        return conn
+
+
+class SQLiteMemoryStore:
+    """
+    SQLite (WAL mode) storage. The scalar fields used for lookups and filtering are
+    real, indexed columns; nested fields are kept as JSON text blobs.
+    Writes are single-row transactions, so concurrent readers never see a half-written part.
+    """
+
+    SCALAR_COLUMNS = [
+        "filename", "uploaded_at", "selected_material", "selected_process",
+        "quantity", "manufacturability_score", "last_updated", "revision"
+    ]
+    JSON_COLUMNS = ["design_intent", "dfm_issues", "chat_history", "memory_log"]
+    INDEXED_COLUMNS = ["selected_process", "selected_material", "quantity", "manufacturability_score"]
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.journal = SQLiteLogJournal(self)
+        self.side = SQLiteSideFieldStore(self)
+        self.archive = SQLiteArchiveStore(self)
+        # The parts table already carries the indexed scalar columns, so it doubles as the catalog.
+        self.catalog = PartCatalog(self.connection, table="parts", maintained=False)
+        self._connections = SQLiteConnections(self.path, self._create_schema)
+
+    def connection(self) -> sqlite3.Connection:
+        return self._connections.get()
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        columns = ", ".join(
+            ["part_id TEXT PRIMARY KEY"]
+            + [f"{c} INTEGER" if c in ("quantity", "manufacturability_score") else f"{c} TEXT" for c in self.SCALAR_COLUMNS]
+            + [f"{c} TEXT" for c in self.JSON_COLUMNS]
+        )
+        with conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS parts ({columns})")
+            # Databases created by an older version lack columns added since.
+            existing = {row["name"] for row in conn.execute("PRAGMA table_info(parts)")}
+            for column in self.SCALAR_COLUMNS + self.JSON_COLUMNS:
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE parts ADD COLUMN {column}")
+            for column in self.INDEXED_COLUMNS:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_parts_{column} ON parts ({column})")
+            PartCatalog.create_indexes(conn, "parts")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS memory_log "
+                "(seq INTEGER PRIMARY KEY AUTOINCREMENT, part_id TEXT NOT NULL, entry TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_memory_log_part_id ON memory_log (part_id, seq)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS memory_log_bases (part_id TEXT PRIMARY KEY, base INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS side_fields "
+                "(part_id TEXT NOT NULL, field TEXT NOT NULL, value TEXT NOT NULL, PRIMARY KEY (part_id, field))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS archive_segments (part_id TEXT NOT NULL, field TEXT NOT NULL, "
+                "seq INTEGER NOT NULL, data BLOB NOT NULL, PRIMARY KEY (part_id, field, seq))"
+            )
+
+    def _row_to_record(self, row: sqlite3.Row) -> dict:
+        record = {"part_id": row["part_id"]}
+        for column in self.SCALAR_COLUMNS:
+            record[column] = row[column]
+        for column in self.JSON_COLUMNS:
+            record[column] = json.loads(row[column]) if row[column] is not None else None
+        return {k: v for k, v in record.items() if v is not None}
+
+    def _record_to_row(self, part_id: str, record: dict) -> list:
+        row = [part_id]
+        for column in self.SCALAR_COLUMNS:
+            value = record.get(column)
+            row.append(value if value is None or isinstance(value, (int, str)) else str(value))
+        for column in self.JSON_COLUMNS:
+            value = record.get(column)
+            row.append(json.dumps(value, default=str) if value is not None else None)
+        return row
+
+    def signature(self, part_id: str) -> Optional[tuple]:
+        # Any commit from another connection grows or rewrites the WAL file.
+        self.connection()
+        return (file_signature(self.path), file_signature(Path(f"{self.path}-wal")))
+
+    def exists(self, part_id: str) -> bool:
+        row = self.connection().execute("SELECT 1 FROM parts WHERE part_id = ?", (part_id,)).fetchone()
+        return row is not None
+
+    def load(self, part_id: str) -> Optional[dict]:
+        conn = self.connection()
+        row = conn.execute("SELECT * FROM parts WHERE part_id = ?", (part_id,)).fetchone()
+        return self._row_to_record(row) if row else None
+
+    def save(self, part_id: str, record: dict):
+        self.save_many({part_id: record})
+
+    def load_many(self, part_ids: List[str]) -> Dict[str, dict]:
+        conn = self.connection()
+        records = {}
+        for chunk in chunked(part_ids, SQLITE_MAX_PARAMS):
+            placeholders = ", ".join("?" for _ in chunk)
+            for row in conn.execute(f"SELECT * FROM parts WHERE part_id IN ({placeholders})", chunk):
+                records[row["part_id"]] = self._row_to_record(row)
+        return records
+
+    def save_many(self, records: Dict[str, dict]):
+        columns = ["part_id"] + self.SCALAR_COLUMNS + self.JSON_COLUMNS
+        placeholders = ", ".join("?" for _ in columns)
+        conn = self.connection()
+        with conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO parts ({', '.join(columns)}) VALUES ({placeholders})",
+                [self._record_to_row(part_id, record) for part_id, record in records.items()]
+            )
+
+    def iter_records(self) -> Iterator[dict]:
+        conn = self.connection()
+        for row in conn.execute("SELECT * FROM parts ORDER BY part_id"):
+            yield self._row_to_record(row)
+
+
+class SQLiteLogJournal:
+    """memory_log journal kept in the memory_log table of a SQLiteMemoryStore; an append is one INSERT."""
+
+    def __init__(self, store: SQLiteMemoryStore):
+        self.store = store
+
+    def signature(self, part_id: str) -> Optional[tuple]:
+        return self.store.signature(part_id)
+
+    def read(self, part_id: str) -> List[dict]:
+        rows = self.store.connection().execute(
+            "SELECT entry FROM memory_log WHERE part_id = ? ORDER BY seq", (part_id,)
+        )
+        return [json.loads(row["entry"]) for row in rows]
+
+    def revision(self, part_id: str) -> int:
+        """Grows with every change: appends raise the highest seq, anything else (see bump) advances the base."""
+        row = self.store.connection().execute(
+            "SELECT COALESCE((SELECT base FROM memory_log_bases WHERE part_id = ?), 0) "
+            "+ COALESCE(MAX(seq), 0) AS revision FROM memory_log WHERE part_id = ?", (part_id, part_id)
+        ).fetchone()
+        return row["revision"]
+
+    def bump(self, part_id: str):
+        """Advances the revision without changing the journal, e.g. when the part's chat_history is archived."""
+        conn = self.store.connection()
+        with conn:
+            self._advance(conn, part_id)
+
+    @staticmethod
+    def _advance(conn: sqlite3.Connection, part_id: str):
+        # Run in the transaction that changes the journal, before rows are deleted.
+        conn.execute(
+            "INSERT INTO memory_log_bases (part_id, base) "
+            "SELECT ?, COALESCE(MAX(seq), 0) + 1 FROM memory_log WHERE part_id = ? "
+            "ON CONFLICT (part_id) DO UPDATE SET base = base + excluded.base",
+            (part_id, part_id)
+        )
+
+    def read_many(self, part_ids: List[str]) -> Dict[str, List[dict]]:
+        conn = self.store.connection()
+        logs = {part_id: [] for part_id in part_ids}
+        for chunk in chunked(part_ids, SQLITE_MAX_PARAMS):
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = conn.execute(
+                f"SELECT part_id, entry FROM memory_log WHERE part_id IN ({placeholders}) ORDER BY seq", chunk
+            )
+            for row in rows:
+                logs[row["part_id"]].append(json.loads(row["entry"]))
+        return logs
+
+    def append(self, part_id: str, entries: List[dict]):
+        conn = self.store.connection()
+        with conn:
+            conn.executemany(
+                "INSERT INTO memory_log (part_id, entry) VALUES (?, ?)",
+                [(part_id, json.dumps(e, default=str)) for e in entries]
+            )
+
+    def rewrite(self, part_id: str, entries: List[dict]):
+        conn = self.store.connection()
+        with conn:
+            self._advance(conn, part_id)
+            conn.execute("DELETE FROM memory_log WHERE part_id = ?", (part_id,))
+            conn.executemany(
+                "INSERT INTO memory_log (part_id, entry) VALUES (?, ?)",
+                [(part_id, json.dumps(e, default=str)) for e in entries]
+            )
+
+    def sync(self, part_id: str, memory_log: List[dict]):
+        conn = self.store.connection()
+        # Take the write lock before reading so the compare-and-write is atomic across workers.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            plan = plan_journal_sync(memory_log, self.read(part_id))
+            if plan is not None:
+                op, entries = plan
+                if op == "rewrite":
+                    self._advance(conn, part_id)
+                    conn.execute("DELETE FROM memory_log WHERE part_id = ?", (part_id,))
+                conn.executemany(
+                    "INSERT INTO memory_log (part_id, entry) VALUES (?, ?)",
+                    [(part_id, json.dumps(e, default=str)) for e in entries]
+                )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    def trim(self, part_id: str, entries: List[dict]):
+        conn = self.store.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT seq, entry FROM memory_log WHERE part_id = ? ORDER BY seq LIMIT ?", (part_id, len(entries))
+            ).fetchall()
+            if [json.loads(row["entry"]) for row in rows] == entries:
+                self._advance(conn, part_id)
+                conn.executemany("DELETE FROM memory_log WHERE seq = ?", [(row["seq"],) for row in rows])
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+
+class SQLiteSideFieldStore:
+    """Heavy PartMemory fields kept in the side_fields table of a SQLiteMemoryStore."""
+
+    def __init__(self, store: SQLiteMemoryStore):
+        self.store = store
+
+    def signature(self, part_id: str, field: str) -> Optional[tuple]:
+        return self.store.signature(part_id)
+
+    def exists(self, part_id: str, field: str) -> bool:
+        row = self.store.connection().execute(
+            "SELECT 1 FROM side_fields WHERE part_id = ? AND field = ?", (part_id, field)
+        ).fetchone()
+        return row is not None
+
+    def read(self, part_id: str, field: str) -> Optional[Any]:
+        row = self.store.connection().execute(
+            "SELECT value FROM side_fields WHERE part_id = ? AND field = ?", (part_id, field)
+        ).fetchone()
+        return json.loads(row["value"]) if row else None
+
+    def read_many(self, part_ids: List[str], field: str) -> Dict[str, Any]:
+        conn = self.store.connection()
+        values = {part_id: None for part_id in part_ids}
+        for chunk in chunked(part_ids, SQLITE_MAX_PARAMS):
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = conn.execute(
+                f"SELECT part_id, value FROM side_fields WHERE field = ? AND part_id IN ({placeholders})",
+                [field] + chunk
+            )
+            for row in rows:
+                values[row["part_id"]] = json.loads(row["value"])
+        return values
+
+    def write(self, part_id: str, field: str, value: Any):
+        conn = self.store.connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO side_fields (part_id, field, value) VALUES (?, ?, ?)",
+                (part_id, field, json.dumps(value, default=str))
+            )
+
+
+class SQLiteArchiveStore:
+    """Archived entries kept as gzip-compressed segment blobs in the archive_segments table of a SQLiteMemoryStore."""
+
+    def __init__(self, store: SQLiteMemoryStore):
+        self.store = store
+
+    def segments(self, part_id: str, field: str) -> List[int]:
+        rows = self.store.connection().execute(
+            "SELECT seq FROM archive_segments WHERE part_id = ? AND field = ? ORDER BY seq", (part_id, field)
+        )
+        return [row["seq"] for row in rows]
+
+    def read(self, part_id: str, field: str, seq: int) -> List[dict]:
+        row = self.store.connection().execute(
+            "SELECT data FROM archive_segments WHERE part_id = ? AND field = ? AND seq = ?", (part_id, field, seq)
+        ).fetchone()
+        return serializers.loads(gzip.decompress(row["data"])) if row else []
+
+    def append(self, part_id: str, field: str, entries: List[dict]):
+        conn = self.store.connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO archive_segments (part_id, field, seq, data) VALUES (?, ?, "
+                "(SELECT COALESCE(MAX(seq), 0) + 1 FROM archive_segments WHERE part_id = ? AND field = ?), ?)",
+                (part_id, field, part_id, field, gzip.compress(serializers.dumps(entries)))
+            )
+
+
+class PartCatalog:
+    """
+    Secondary indexes over the scalar fields used to list and filter parts, so a filtered
+    listing is an index lookup rather than a scan of every part record. File-based storage
+    modes keep a standalone catalog database that is upserted on every save; SQLite mode
+    queries its parts table directly.
+    """
+
+    COLUMNS = ["selected_process", "selected_material", "quantity", "manufacturability_score", "last_updated"]
+
+    def __init__(self, connection: Callable[[], sqlite3.Connection], table: str = "catalog", maintained: bool = True):
+        self.connection = connection
+        self.table = table
+        self.maintained = maintained
+
+    @classmethod
+    def standalone(cls, path: Path) -> "PartCatalog":
+        return cls(SQLiteConnections(path, cls._create_standalone_schema).get)
+
+    @classmethod
+    def _create_standalone_schema(cls, conn: sqlite3.Connection):
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS catalog (part_id TEXT PRIMARY KEY, selected_process TEXT, "
+                "selected_material TEXT, quantity INTEGER, manufacturability_score INTEGER, last_updated TEXT)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS catalog_meta (key TEXT PRIMARY KEY, value TEXT)")
+            cls.create_indexes(conn, "catalog")
+
+    @staticmethod
+    def create_indexes(conn: sqlite3.Connection, table: str):
+        # Process and material filters are case-insensitive, so those indexes use NOCASE.
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_process_nocase ON {table} (selected_process COLLATE NOCASE)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_material_nocase ON {table} (selected_material COLLATE NOCASE)")
+        for column in ("quantity", "manufacturability_score", "last_updated"):
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})")
+
+    def _row(self, part_id: str, record: dict) -> list:
+        return [part_id] + [record.get(column) for column in self.COLUMNS]
+
+    def upsert(self, records: Dict[str, dict]):
+        if not self.maintained:
+            return
+        columns = ["part_id"] + self.COLUMNS
+        conn = self.connection()
+        with conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO catalog ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                [self._row(part_id, record) for part_id, record in records.items()]
+            )
+
+    def is_built(self) -> bool:
+        if not self.maintained:
+            return True
+        row = self.connection().execute("SELECT value FROM catalog_meta WHERE key = 'built'").fetchone()
+        return row is not None
+
+    def rebuild(self, records: Iterator[dict]):
+        """
+        Indexes every part from the store. Rows already upserted by saves are newer than a
+        concurrent full read, so they are kept rather than overwritten.
+        """
+        if not self.maintained:
+            return
+        columns = ["part_id"] + self.COLUMNS
+        conn = self.connection()
+        with conn:
+            conn.executemany(
+                f"INSERT OR IGNORE INTO catalog ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                (self._row(record["part_id"], record) for record in records)
+            )
+            conn.execute("INSERT OR REPLACE INTO catalog_meta (key, value) VALUES ('built', '1')")
+
+    def query(self, process: Optional[str] = None, material: Optional[str] = None,
+              min_quantity: Optional[int] = None, max_quantity: Optional[int] = None,
+              min_score: Optional[int] = None, max_score: Optional[int] = None,
+              updated_since: Optional[str] = None, updated_until: Optional[str] = None,
+              after: Optional[str] = None, limit: int = 50) -> Tuple[List[dict], Optional[str]]:
+        """
+        Returns up to `limit` catalog rows ordered by part_id, starting after the `after`
+        part_id, and the part_id to continue from (None on the last page).
+        """
+        clauses = []
+        params = []
+        for clause, value in (
+            ("selected_process = ? COLLATE NOCASE", process),
+            ("selected_material = ? COLLATE NOCASE", material),
+            ("quantity >= ?", min_quantity),
+            ("quantity <= ?", max_quantity),
+            ("manufacturability_score >= ?", min_score),
+            ("manufacturability_score <= ?", max_score),
+            ("last_updated >= ?", updated_since),
+            ("last_updated <= ?", updated_until),
+            ("part_id > ?", after),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.connection().execute(
+            f"SELECT part_id, {', '.join(self.COLUMNS)} FROM {self.table}{where} ORDER BY part_id LIMIT ?",
+            params + [limit + 1]
+        ).fetchall()
+        page = [dict(row) for row in rows[:limit]]
+        next_after = page[-1]["part_id"] if len(rows) > limit else None
+        return page, next_after
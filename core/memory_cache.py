@@ -0,0 +1,71 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Hashable, Optional, Set, Tuple
+from core.memory_types import PartMemory
+
+
+class PartMemoryCache:
+    """
+    Bounded LRU cache of validated PartMemory objects.
+    Every entry remembers the storage signature (inode, mtime, size) it was read at,
+    so a write from another process shows up as a miss instead of a stale hit.
+    A part can be cached in several variants (e.g. with and without its heavy fields).
+    """
+
+    def __init__(self, max_size: int = 512):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[tuple, PartMemory]]" = OrderedDict()
+        self._variants: Dict[str, Set[Hashable]] = {}
+        self._lock = Lock()
+
+    def get(self, part_id: str, signature: Optional[tuple], variant: Hashable = None) -> Optional[PartMemory]:
+        key = (part_id, variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or signature is None or entry[0] != signature:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1].copy(deep=True)
+
+    def put(self, part_id: str, signature: Optional[tuple], memory: PartMemory, variant: Hashable = None):
+        if signature is None or self.max_size <= 0:
+            return
+        key = (part_id, variant)
+        with self._lock:
+            self._entries[key] = (signature, memory.copy(deep=True))
+            self._entries.move_to_end(key)
+            self._variants.setdefault(part_id, set()).add(variant)
+            while len(self._entries) > self.max_size:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, part_id: Optional[str] = None):
+        with self._lock:
+            if part_id is None:
+                self._entries.clear()
+                self._variants.clear()
+                return
+            for variant in self._variants.pop(part_id, ()):
+                self._entries.pop((part_id, variant), None)
+
+    def _drop(self, key: Tuple[str, Hashable]):
+        del self._entries[key]
+        variants = self._variants.get(key[0])
+        if variants is not None:
+            variants.discard(key[1])
+            if not variants:
+                del self._variants[key[0]]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "max_size": self.max_size
+            }
@@ -0,0 +1,55 @@
+import asyncio
+import os
+from threading import Lock
+from typing import Dict, Set, Tuple
+
+# How often an open event stream re-checks the part's revision, to pick up saves made by
+# other worker processes (their events never reach this process's bus).
+EVENTS_POLL_SECONDS = float(os.getenv("AXIS5_EVENTS_POLL_SECONDS", "2"))
+EVENTS_QUEUE_SIZE = 100
+
+
+def _offer(queue: asyncio.Queue, event: dict):
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        # A stalled client misses events; the revision poll still tells it the part changed.
+        pass
+
+
+class MemoryEventBus:
+    """
+    In-process fan-out of part change events to event-stream subscribers.
+    Publishing is safe from any thread; each subscriber's queue lives on its own event loop.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = Lock()
+
+    def subscribe(self, part_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(part_id, set()).add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, part_id: str, queue: asyncio.Queue):
+        with self._lock:
+            subscribers = self._subscribers.get(part_id, set())
+            for entry in [entry for entry in subscribers if entry[1] is queue]:
+                subscribers.discard(entry)
+            if not subscribers:
+                self._subscribers.pop(part_id, None)
+
+    def publish(self, part_id: str, event: dict):
+        with self._lock:
+            subscribers = list(self._subscribers.get(part_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:
+                # The subscriber's loop has shut down.
+                self.unsubscribe(part_id, queue)
+
+
+events = MemoryEventBus()
@@ -0,0 +1,40 @@
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+# Hot window kept in chat_history / memory_log; older entries move to the part's archive.
+RETENTION_MAX_ENTRIES = int(os.getenv("AXIS5_RETENTION_MAX_ENTRIES", "200"))
+# Entries older than this are archived even inside the hot window; 0 disables the age limit.
+RETENTION_MAX_AGE_DAYS = int(os.getenv("AXIS5_RETENTION_MAX_AGE_DAYS", "90"))
+# Archive in batches of at least this many entries, so a part at the limit does not
+# write a one-entry segment on every save.
+RETENTION_MIN_SEGMENT = int(os.getenv("AXIS5_RETENTION_MIN_SEGMENT", "50"))
+
+
+def _entry_time(entry: dict) -> Optional[datetime]:
+    value = entry.get("timestamp") if isinstance(entry, dict) else None
+    if not isinstance(value, str):
+        return value if isinstance(value, datetime) else None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def entries_to_archive(entries: List[dict], now: Optional[datetime] = None) -> int:
+    """
+    Number of leading (oldest) entries that fall outside the retention window, or 0 when
+    there are too few of them to be worth a segment. Entries without a readable timestamp
+    are only ever archived by count.
+    """
+    split = max(len(entries) - RETENTION_MAX_ENTRIES, 0)
+    if RETENTION_MAX_AGE_DAYS > 0:
+        cutoff = (now or datetime.utcnow()) - timedelta(days=RETENTION_MAX_AGE_DAYS)
+        expired = 0
+        for entry in entries:
+            timestamp = _entry_time(entry)
+            if timestamp is None or timestamp >= cutoff:
+                break
+            expired += 1
+        split = max(split, expired)
+    return split if split >= RETENTION_MIN_SEGMENT else 0
@@ -1,40 +1,506 @@
-import json
+import os
+import uuid
+import base64
+import binascii
+import hashlib
+from contextlib import ExitStack
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
+from core import serializers
+from core.file_locks import locked
+from core.json_patch import JsonPatchError, apply_patch, parse_pointer
 from core.memory_types import PartMemory, MemoryLogEntry
+from core.memory_backends import MonolithicMemoryStore, ShardedMemoryStore, SQLiteMemoryStore, PartCatalog
+from core.memory_cache import PartMemoryCache
+from core.memory_events import events
+from core.memory_retention import entries_to_archive
 
 MEMORY_PATH = Path("data/cad_memory.json")
+SHARD_DIR = Path("data/cad_memory")
+SQLITE_PATH = Path("data/cad_memory.sqlite")
+# Per-part memory_log journals for the file-based storage modes.
+JOURNAL_DIR = Path("data/cad_memory_journal")
+# Heavy fields (chat_history) split out of the part record for the file-based storage modes.
+SIDE_DIR = Path("data/cad_memory_side")
+# Compressed segments of chat_history/memory_log entries aged out of the hot record.
+ARCHIVE_DIR = Path("data/cad_memory_archive")
+# Lock files serializing saves, so a conditional (If-Match) update's check and write are atomic.
+LOCK_DIR = Path("data/cad_memory_locks")
+# Parts are hashed onto this many locks, which bounds the lock files and the files a batch holds open.
+LOCK_STRIPES = int(os.getenv("AXIS5_MEMORY_LOCK_STRIPES", "64"))
+# Secondary indexes for listing/filtering parts in the file-based storage modes.
+CATALOG_PATH = Path("data/cad_memory_catalog.sqlite")
+
+# Unbounded PartMemory fields kept outside the part record and only read when asked for.
+HEAVY_FIELDS = ("chat_history", "memory_log")
+
+# "monolithic" keeps every part in MEMORY_PATH, "sharded" keeps one file per part under SHARD_DIR,
+# "sqlite" keeps one row per part in SQLITE_PATH.
+# Run scripts/migrate_cad_memory.py before switching an existing deployment to "sharded".
+STORAGE_MODE = os.getenv("AXIS5_MEMORY_STORAGE", "monolithic")
+
+# Build PartMemory objects for records this store wrote (they carry a revision) without
+# re-running validation. Set to 0 to validate every load.
+TRUSTED_LOADS = os.getenv("AXIS5_TRUSTED_LOADS", "1") != "0"
+
+# Validated PartMemory objects kept in-process; 0 disables the cache.
+MEMORY_CACHE_SIZE = int(os.getenv("AXIS5_MEMORY_CACHE_SIZE", "512"))
+_cache = PartMemoryCache(max_size=MEMORY_CACHE_SIZE)
+_sqlite_stores = {}
+_catalogs = {}
+
+
+
+def get_store(mode: Optional[str] = None):
+    mode = mode or STORAGE_MODE
+    if mode == "sqlite":
+        # SQLite stores hold per-thread connections, so reuse one instance per database file.
+        if SQLITE_PATH not in _sqlite_stores:
+            _sqlite_stores[SQLITE_PATH] = SQLiteMemoryStore(SQLITE_PATH)
+        return _sqlite_stores[SQLITE_PATH]
+    if mode == "sharded":
+        return ShardedMemoryStore(SHARD_DIR, JOURNAL_DIR, SIDE_DIR, ARCHIVE_DIR)
+    if mode == "monolithic":
+        return MonolithicMemoryStore(MEMORY_PATH, JOURNAL_DIR, SIDE_DIR, ARCHIVE_DIR)
+    raise ValueError(f"Unknown memory storage mode: {mode}")
+
+
+
+def get_catalog(mode: Optional[str] = None) -> PartCatalog:
+    store = get_store(mode)
+    catalog = getattr(store, "catalog", None)
+    if catalog is not None:
+        return catalog
+    if CATALOG_PATH not in _catalogs:
+        _catalogs[CATALOG_PATH] = PartCatalog.standalone(CATALOG_PATH)
+    return _catalogs[CATALOG_PATH]
 
 
 
 def load_memory() -> dict:
-    if MEMORY_PATH.exists():
-        with open(MEMORY_PATH, "r") as f:
-            return json.load(f)
-    return {}
+    return MonolithicMemoryStore(MEMORY_PATH, JOURNAL_DIR, SIDE_DIR, ARCHIVE_DIR).load_all()
 
 
 
 def save_memory(memory_data: dict):
-    MEMORY_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(MEMORY_PATH, "w") as f:
-        json.dump(memory_data, f, default=str, indent=2)
+    MonolithicMemoryStore(MEMORY_PATH, JOURNAL_DIR, SIDE_DIR, ARCHIVE_DIR).save_all(memory_data)
+
+
+
+def _plain(value):
+    # Same shape the entries have once written to and read back from JSON (datetimes become strings).
+    return serializers.loads_json(serializers.dumps_json(value))
+
+
+
+def _record_signature(store, part_id: str, heavy_fields: Tuple[str, ...]) -> Optional[tuple]:
+    signature = store.signature(part_id)
+    if signature is None:
+        return None
+    signature = (signature,)
+    if "memory_log" in heavy_fields:
+        signature += (store.journal.signature(part_id),)
+    if "chat_history" in heavy_fields:
+        signature += (store.side.signature(part_id, "chat_history"),)
+    return signature
+
+
+
+def _normalize_fields(heavy_fields) -> Tuple[str, ...]:
+    return tuple(f for f in HEAVY_FIELDS if f in heavy_fields)
+
 
 
+def part_exists(part_id: str) -> bool:
+    return get_store().exists(part_id)
 
-def get_part_memory(part_id: str) -> Optional[PartMemory]:
-    data = load_memory()
-    if part_id in data:
-        return PartMemory(**data[part_id])
+
+
+def get_part_memory(part_id: str, heavy_fields: Tuple[str, ...] = HEAVY_FIELDS) -> Optional[PartMemory]:
+    """
+    Loads one part. Pass heavy_fields=() when only scalar fields are needed: chat_history
+    and memory_log are then neither read nor parsed, and stay empty on the returned object.
+    """
+    heavy_fields = _normalize_fields(heavy_fields)
+    store = get_store()
+    signature = _record_signature(store, part_id, heavy_fields)
+    if signature is None:
+        return None
+    cached = _cache.get(part_id, signature, heavy_fields)
+    if cached is not None:
+        return cached
+    record = store.load(part_id)
+    if record is not None:
+        journal = store.journal.read(part_id) if "memory_log" in heavy_fields else None
+        chat_history = store.side.read(part_id, "chat_history") if "chat_history" in heavy_fields else None
+        memory = _build_memory(record, heavy_fields, journal, chat_history)
+        _cache.put(part_id, signature, memory, heavy_fields)
+        return memory
     return None
 
 
 
+def get_part_memories(part_ids: List[str], heavy_fields: Tuple[str, ...] = HEAVY_FIELDS) -> Dict[str, PartMemory]:
+    """
+    Resolves many parts at once. Cached parts are served from memory; the rest are read
+    in a single storage pass. Unknown part_ids are left out of the result.
+    """
+    heavy_fields = _normalize_fields(heavy_fields)
+    store = get_store()
+    found = {}
+    signatures = {}
+    for part_id in dict.fromkeys(part_ids):
+        signature = _record_signature(store, part_id, heavy_fields)
+        if signature is None:
+            continue
+        cached = _cache.get(part_id, signature, heavy_fields)
+        if cached is not None:
+            found[part_id] = cached
+        else:
+            signatures[part_id] = signature
+    if signatures:
+        records = store.load_many(list(signatures))
+        loaded = list(records)
+        journals = store.journal.read_many(loaded) if "memory_log" in heavy_fields else {}
+        chats = store.side.read_many(loaded, "chat_history") if "chat_history" in heavy_fields else {}
+        for part_id, record in records.items():
+            memory = _build_memory(record, heavy_fields, journals.get(part_id), chats.get(part_id))
+            _cache.put(part_id, signatures[part_id], memory, heavy_fields)
+            found[part_id] = memory
+    return found
+
+
+
+def _build_memory(record: dict, heavy_fields: Tuple[str, ...], journal: Optional[List[dict]],
+                  chat_history: Optional[List[dict]]) -> PartMemory:
+    # Records written before the heavy fields were split out still carry them inline.
+    inline_log = record.pop("memory_log", None) or []
+    inline_chat = record.pop("chat_history", None) or []
+    if "memory_log" in heavy_fields:
+        record["memory_log"] = inline_log + journal
+    if "chat_history" in heavy_fields:
+        record["chat_history"] = chat_history if chat_history is not None else inline_chat
+    # Only save_part_memories sets a revision, and it writes validated PartMemory objects;
+    # older or hand-edited records are still validated.
+    if TRUSTED_LOADS and record.get("revision"):
+        return PartMemory.from_trusted(record)
+    return PartMemory(**record)
+
+
+
 def save_part_memory(memory: PartMemory):
-    data = load_memory()
-    data[memory.part_id] = memory.dict()
-    save_memory(data)
+    save_part_memories([memory])
+
+
+
+def save_part_memories(memories: List[PartMemory]):
+    """
+    Upserts many parts with one write to the part store (one transaction in SQLite mode).
+    Heavy fields are only written when they were loaded or set on the memory, so saving a
+    part fetched with heavy_fields=() leaves its chat history and log untouched.
+    Entries that fall outside the retention window are moved to the part's archive.
+
+    The lock stripes of the saved parts are held for the write, so a save never lands
+    between the revision check and the write of patch_part_memory(). The whole record is
+    still rewritten: concurrent saves of one part are last-writer-wins.
+    """
+    with ExitStack() as stack:
+        # Taken in a fixed order so batches sharing stripes cannot deadlock.
+        for path in sorted({_lock_path(memory.part_id) for memory in memories}):
+            stack.enter_context(locked(path, "memory_save"))
+        _save_locked(memories)
+
+
+
+def _lock_path(part_id: str) -> Path:
+    digest = hashlib.sha1(part_id.encode("utf-8")).digest()
+    return LOCK_DIR / f"stripe-{int.from_bytes(digest[:4], 'big') % max(LOCK_STRIPES, 1):03d}"
+
+
+
+def _save_locked(memories: List[PartMemory]):
+    store = get_store()
+    records = {}
+    heavy_values = {}
+    partial = []
+    for memory in memories:
+        memory.revision = uuid.uuid4().hex[:16]
+        memory.last_updated = datetime.utcnow().isoformat()
+        record = memory.dict()
+        provided = [f for f in HEAVY_FIELDS if f in memory.__fields_set__]
+        heavy_values[memory.part_id] = {f: _plain(record[f] or []) for f in provided}
+        for field in HEAVY_FIELDS:
+            record.pop(field, None)
+        records[memory.part_id] = record
+        if len(provided) < len(HEAVY_FIELDS):
+            partial.append(memory.part_id)
+    if partial:
+        _split_inline_fields(store, partial, heavy_values)
+    store.save_many(records)
+    get_catalog().upsert(records)
+    for part_id, values in heavy_values.items():
+        if "chat_history" in values:
+            store.side.write(part_id, "chat_history", values["chat_history"])
+        if "memory_log" in values:
+            store.journal.sync(part_id, values["memory_log"])
+        _archive_old_entries(store, part_id, values)
+        _cache.invalidate(part_id)
+    for part_id, record in records.items():
+        events.publish(part_id, {
+            "type": "saved",
+            "part_id": part_id,
+            "revision": record["revision"],
+            "manufacturability_score": record.get("manufacturability_score")
+        })
+
+
+
+def _archive_old_entries(store, part_id: str, values: Dict[str, list]) -> int:
+    """
+    Moves entries outside the retention window (see core/memory_retention.py) from the hot
+    chat_history/memory_log into a new archive segment. The segment is written before the
+    entries are dropped, so a crash in between can only duplicate, never lose, history.
+    """
+    moved = 0
+    for field, entries in values.items():
+        count = entries_to_archive(entries)
+        if not count:
+            continue
+        store.archive.append(part_id, field, entries[:count])
+        if field == "memory_log":
+            store.journal.trim(part_id, entries[:count])
+        else:
+            store.side.write(part_id, field, entries[count:])
+            # The part record is not rewritten, so move the journal revision on for ETags instead.
+            store.journal.bump(part_id)
+        moved += count
+    return moved
+
+
+
+def apply_retention(part_ids: Optional[List[str]] = None) -> int:
+    """
+    Archives old chat_history/memory_log entries without rewriting part records, for parts
+    that have grown through log appends alone. Returns the number of entries archived.
+    """
+    store = get_store()
+    if part_ids is None:
+        part_ids = [record["part_id"] for record in store.iter_records()]
+    moved = 0
+    for part_id in part_ids:
+        values = {
+            "chat_history": store.side.read(part_id, "chat_history") or [],
+            "memory_log": store.journal.read(part_id)
+        }
+        archived = _archive_old_entries(store, part_id, values)
+        if archived:
+            _cache.invalidate(part_id)
+        moved += archived
+    return moved
+
+
+
+def get_archived_entries(part_id: str, field: str, cursor: Optional[int] = None) -> dict:
+    """
+    One archive segment of a part's chat_history or memory_log, newest segment first.
+    Pass the returned next_cursor to page further back; it is None after the oldest segment.
+    """
+    segments = get_store().archive.segments(part_id, field)
+    if cursor is not None:
+        segments = [seq for seq in segments if seq < cursor]
+    if not segments:
+        return {"entries": [], "segment": None, "next_cursor": None}
+    seq = segments[-1]
+    return {
+        "entries": get_store().archive.read(part_id, field, seq),
+        "segment": seq,
+        "next_cursor": seq if len(segments) > 1 else None
+    }
+
+
+
+def _split_inline_fields(store, part_ids: List[str], heavy_values: Dict[str, dict]):
+    """
+    Older records keep chat_history/memory_log inline. Before such a record is overwritten
+    by one that omits those fields, move them to their side stores so nothing is lost.
+    Once a record has been rewritten this finds nothing to do.
+    """
+    for part_id, old in store.load_many(part_ids).items():
+        provided = heavy_values[part_id]
+        if "chat_history" not in provided and old.get("chat_history") and not store.side.exists(part_id, "chat_history"):
+            store.side.write(part_id, "chat_history", old["chat_history"])
+        if "memory_log" not in provided and old.get("memory_log"):
+            store.journal.rewrite(part_id, old["memory_log"] + store.journal.read(part_id))
+
+
+
+def get_part_revision(part_id: str, include_log: bool = False) -> Optional[str]:
+    """
+    Revision token for a part, suitable as an ETag. The record revision changes on every save;
+    include_log also tracks memory_log appends and archiving by apply_retention(), which do
+    not touch the record.
+    Served from the read cache when possible, so it is cheap to call on every request.
+    """
+    memory = get_part_memory(part_id, heavy_fields=())
+    if memory is None:
+        return None
+    revision = memory.revision or "0"
+    if include_log:
+        revision += f".{get_store().journal.revision(part_id)}"
+    return revision
+
+
+
+def append_memory_log(part_id: str, action: str, detail: str) -> dict:
+    """Appends one entry to the part's memory_log journal without loading or rewriting the part record."""
+    entry = _plain(MemoryLogEntry(timestamp=datetime.utcnow(), action=action, detail=detail).dict())
+    get_store().journal.append(part_id, [entry])
+    _cache.invalidate(part_id)
+    events.publish(part_id, {"type": "log", "part_id": part_id, "entries": [entry]})
+    return entry
+
+
+
+def list_parts(cursor: Optional[str] = None, limit: int = 50, **filters) -> dict:
+    """
+    Lists parts from the catalog indexes, filtered by process, material, quantity, score
+    and last_updated ranges (see PartCatalog.query). `cursor` is the opaque next_cursor
+    of the previous page. Raises ValueError for a malformed cursor.
+    """
+    after = decode_parts_cursor(cursor)
+    catalog = get_catalog()
+    if not catalog.is_built():
+        # First listing against a store that predates the catalog: index it once.
+        catalog.rebuild(get_store().iter_records())
+    parts, next_after = catalog.query(after=after, limit=limit, **filters)
+    return {
+        "parts": parts,
+        "next_cursor": base64.urlsafe_b64encode(next_after.encode("utf-8")).decode() if next_after else None
+    }
+
+
+
+def decode_parts_cursor(cursor: Optional[str]) -> Optional[str]:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode())
+        # The decoder skips characters outside the alphabet; only cursors list_parts() made are accepted.
+        if not raw or base64.urlsafe_b64encode(raw).decode() != cursor:
+            raise ValueError(cursor)
+        return raw.decode("utf-8")
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+
+class RevisionMismatch(Exception):
+    """The part changed since the revision the client based its update on."""
+
+
+
+def _patched_fields(operations: List[dict]) -> set:
+    fields = set()
+    for op in operations:
+        for key in ("path", "from"):
+            if isinstance(op, dict) and isinstance(op.get(key), str):
+                tokens = parse_pointer(op[key])
+                if not tokens:
+                    raise JsonPatchError("Patching the whole document is not supported; use POST")
+                fields.add(tokens[0])
+    return fields
+
+
+
+def patch_part_memory(part_id: str, operations: List[dict], expected_revision: Optional[str] = None) -> Optional[str]:
+    """
+    Applies RFC 6902 operations to a part and returns its new revision (as from
+    get_part_revision(include_log=True)), or None if the part does not exist.
+    Raises RevisionMismatch when expected_revision, or the value of a `test /revision`
+    operation, is no longer current, JsonPatchError for a bad patch (including paths
+    outside PartMemory's fields) and pydantic's ValidationError for an invalid result.
+
+    Heavy fields are only read and written when an operation touches them, and
+    `add /memory_log/-` operations become plain journal appends.
+    """
+    # `test /revision` is a precondition like If-Match, checked against the current revision.
+    revision_tests = [op for op in operations if isinstance(op, dict) and op.get("op") == "test" and op.get("path") == "/revision"]
+    operations = [op for op in operations if not any(op is t for t in revision_tests)]
+    appends = [op for op in operations if isinstance(op, dict) and op.get("op") == "add" and op.get("path") == "/memory_log/-"]
+    others = [op for op in operations if not any(op is a for a in appends)]
+    fields = _patched_fields(others)
+    if fields & {"part_id", "revision"}:
+        raise JsonPatchError("part_id and revision cannot be patched")
+    unknown = fields - set(PartMemory.__fields__)
+    if unknown:
+        raise JsonPatchError(f"Unknown field: {', '.join(sorted(unknown))}")
+    if "memory_log" in fields:
+        # Other memory_log operations need the whole log, so apply the appends in order with them.
+        appends, others = [], operations
+    new_entries = []
+    for op in appends:
+        if not isinstance(op.get("value"), dict):
+            raise JsonPatchError("memory_log entries must be objects")
+        entry = MemoryLogEntry(**op["value"])
+        entry.timestamp = entry.timestamp or datetime.utcnow()
+        new_entries.append(_plain(entry.dict()))
+
+    with locked(_lock_path(part_id), "memory_patch"):
+        current = get_part_revision(part_id, include_log=True)
+        if current is None:
+            return None
+        if expected_revision is not None and expected_revision not in (current, "*"):
+            raise RevisionMismatch(current)
+        for op in revision_tests:
+            # Either the full token (the ETag) or the record's own revision field, as GET returns it.
+            if op.get("value") not in (current, current.split(".")[0]):
+                raise RevisionMismatch(current)
+        if others:
+            heavy_fields = tuple(f for f in HEAVY_FIELDS if f in fields)
+            memory = get_part_memory(part_id, heavy_fields=heavy_fields)
+            document = _plain(memory.dict(exclude={f for f in HEAVY_FIELDS if f not in heavy_fields}))
+            patched = PartMemory(**apply_patch(document, others))
+            for field in heavy_fields:
+                # A removed heavy field is cleared, not left untouched.
+                if field not in patched.__fields_set__:
+                    setattr(patched, field, [])
+            # This call already holds the part's lock.
+            _save_locked([patched])
+        if new_entries:
+            get_store().journal.append(part_id, new_entries)
+            _cache.invalidate(part_id)
+            events.publish(part_id, {"type": "log", "part_id": part_id, "entries": new_entries})
+        return get_part_revision(part_id, include_log=True)
+
+
+
+def memory_cache_stats() -> dict:
+    return _cache.stats()
+
+
+
+def migrate_memory(source_mode: str = "monolithic", target_mode: str = "sharded") -> int:
+    """Copies every part record from one storage mode into another. Returns the number of parts copied."""
+    source = get_store(source_mode)
+    target = get_store(target_mode)
+    count = 0
+    for record in source.iter_records():
+        part_id = record["part_id"]
+        memory_log = (record.pop("memory_log", None) or []) + source.journal.read(part_id)
+        chat_history = source.side.read(part_id, "chat_history")
+        if chat_history is None:
+            chat_history = record.get("chat_history") or []
+        record.pop("chat_history", None)
+        target.save(part_id, record)
+        target.journal.rewrite(part_id, memory_log)
+        target.side.write(part_id, "chat_history", chat_history)
+        for field in HEAVY_FIELDS:
+            for seq in source.archive.segments(part_id, field):
+                target.archive.append(part_id, field, source.archive.read(part_id, field, seq))
+        get_catalog(target_mode).upsert({part_id: record})
+        count += 1
+    return count
 
 
 
@@ -1,5 +1,7 @@
+import re
 from pydantic import BaseModel
-from typing import List, Optional, Dict
+from typing import List, NamedTuple, Optional, Dict
+from datetime import datetime
 
 
 
@@ -20,6 +22,27 @@ class DFMIssue(BaseModel):
     notes: Optional[str] = None
 
 
+class DFMRule(NamedTuple):
+    """
+    A static entry from the dfm_rules_* catalogs. Immutable, so each catalog is built once
+    and shared; run_dfm_check turns the rules that apply into DFMIssue records.
+    """
+    issue_type: str
+    description: str
+    severity: str
+    suggested_fix: Optional[str] = None
+
+    def to_issue(self) -> DFMIssue:
+        # Rule fields are fixed strings, so there is nothing to validate.
+        return DFMIssue.construct(
+            issue_id=re.sub(r"[^a-z0-9]+", "-", self.issue_type.lower()).strip("-"),
+            description=self.description,
+            severity=self.severity,
+            resolved=False,
+            notes=self.suggested_fix
+        )
+
+
 class MaterialDecision(BaseModel):
     material: str
     process: str
@@ -27,6 +50,12 @@ class MaterialDecision(BaseModel):
     timestamp: Optional[str] = None
 
 
+class MemoryLogEntry(BaseModel):
+    timestamp: Optional[datetime] = None
+    action: str
+    detail: str
+
+
 
 
 class PartMemory(BaseModel):
@@ -46,3 +75,18 @@ class PartMemory(BaseModel):
     memory_log: List[Dict] = []
     manufacturability_score: Optional[int] = None
     last_updated: Optional[str] = None
+    # Set by the memory store on every save; clients echo it back for conditional requests.
+    revision: Optional[str] = None
+
+    @classmethod
+    def from_trusted(cls, record: dict) -> "PartMemory":
+        """
+        Builds a PartMemory without validation, for records the memory store wrote itself
+        from an already validated PartMemory. Anything else must go through PartMemory(**record).
+        """
+        values = dict(record)
+        if values.get("design_intent") is not None:
+            values["design_intent"] = DesignIntent.construct(**values["design_intent"])
+        if values.get("dfm_issues") is not None:
+            values["dfm_issues"] = [DFMIssue.construct(**issue) for issue in values["dfm_issues"]]
+        return cls.construct(**values)
@@ -0,0 +1,28 @@
+from typing import Optional
+from core.memory_store import get_part_memory
+from core.memory_types import PartMemory
+
+
+class PartContext:
+    """
+    A single request's handle on a part. The PartMemory is read from storage at most once
+    and shared by every engine the request passes through (quote -> cost -> vendors, ...).
+    Only scalar fields are loaded; chat_history and memory_log are left empty.
+    """
+
+    def __init__(self, part_id: str, memory: Optional[PartMemory] = None):
+        self.part_id = part_id
+        self._memory = memory
+        self._loaded = memory is not None
+
+    @property
+    def memory(self) -> Optional[PartMemory]:
+        if not self._loaded:
+            self._memory = get_part_memory(self.part_id, heavy_fields=())
+            self._loaded = True
+        return self._memory
+
+
+def resolve_context(part_id: str, ctx: Optional[PartContext] = None) -> PartContext:
+    """Returns the caller's context, or a fresh one for plain part_id calls."""
+    return ctx if ctx is not None else PartContext(part_id)
@@ -2,9 +2,11 @@ from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from core.version_compare import compare_versions
 from core.quote_engine import generate_quote
+from core.part_context import PartContext, resolve_context
 from pathlib import Path
+from typing import Optional
 
-def export_quote_pdf(part_id: str, output_path: str = None):
+def export_quote_pdf(part_id: str, output_path: str = None, ctx: Optional[PartContext] = None):
     export_dir = Path("data/exports")
     export_dir.mkdir(parents=True, exist_ok=True)
     pdf_path = export_dir / f"{part_id}_quote.pdf"
@@ -16,7 +18,7 @@ def export_quote_pdf(part_id: str, output_path: str = None):
     c.drawString(50, y, f"📄 Axis5 Quote & Version Report for Part: {part_id}")
     y -= 40
 
-    quote = generate_quote(part_id)
+    quote = generate_quote(part_id, ctx=resolve_context(part_id, ctx))
     c.setFont("Helvetica", 11)
     c.drawString(50, y, f"Process: {quote.get('process','-')} | Material: {quote.get('material','-')} | Qty: {quote.get('quantity','-')}")
     y -= 20
@@ -0,0 +1,13 @@
+from datetime import datetime
+from pathlib import Path
+from core.append_log import AppendLog
+from core.log_writer import writer
+
+QUERY_LOG_DIR = Path("axis5_query_log")
+LEGACY_QUERY_LOG_PATHS = [Path("axis5_query_log.jsonl")]
+
+query_log = AppendLog(QUERY_LOG_DIR, "query_log", legacy_paths=LEGACY_QUERY_LOG_PATHS)
+
+def append_query(query: str):
+    """Logs one user query; it reaches disk with the log writer's next batch."""
+    writer.submit(query_log, {"query": query, "timestamp": datetime.utcnow().isoformat()}, durability="none")
@@ -1,23 +1,23 @@
 # query_logger_and_reflector.py – Logs Axis5 queries and proposes new rules based on usage
 
-import json
-from datetime import datetime
 from collections import Counter
 import re
+from core.knowledge_pool import append_knowledge
+from core.log_writer import writer
+from core.query_log import append_query, query_log
 
 # 1. Log new query (call this after every user query)
 def log_query(query: str):
-    with open("axis5_query_log.jsonl", "a") as f:
-        f.write(json.dumps({"query": query, "timestamp": datetime.utcnow().isoformat()}) + "\n")
+    append_query(query)
 
 # Example:
 # log_query("What is the minimum wall for ABS?")
 
 # 2. Analyze logs and auto-generate reflection entries
 
-def reflect_from_logs():
-    with open("axis5_query_log.jsonl") as f:
-        queries = [json.loads(line)["query"] for line in f.readlines()]
+def reflect_from_logs(since: str = None):
+    writer.flush()  # queries are logged without waiting, so write out the queued ones first
+    queries = [entry["query"] for entry in query_log.iter_entries(since=since)]
 
     phrases = []
     for q in queries:
@@ -37,9 +37,7 @@ def reflect_from_logs():
             "process": None
         })
 
-    with open("axis5_knowledge_pool.jsonl", "a") as f:
-        for e in reflection_entries:
-            f.write(json.dumps(e) + "\n")
+    append_knowledge(reflection_entries)
 
     print(f"✅ Reflected {len(reflection_entries)} items from recent logs.")
 
@@ -1,14 +1,16 @@
-from core.memory_store import get_part_memory
+from typing import Optional
+from core.part_context import PartContext, resolve_context
 from core.cost_optimizer import simulate_cost
 from core.vendor_finder import find_matching_vendors
 
-def generate_quote(part_id: str):
-    memory = get_part_memory(part_id)
+def generate_quote(part_id: str, ctx: Optional[PartContext] = None):
+    ctx = resolve_context(part_id, ctx)
+    memory = ctx.memory
     if not memory:
         return {"error": "Part not found"}
 
-    cost_data = simulate_cost(part_id)
-    vendors = find_matching_vendors(part_id)
+    cost_data = simulate_cost(part_id, ctx=ctx)
+    vendors = find_matching_vendors(part_id, ctx=ctx)
 
     return {
         "part_id": part_id,
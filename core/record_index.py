@@ -0,0 +1,227 @@
+import mmap
+import os
+import re
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterator, List, Optional, Tuple
+from core import serializers
+from core.file_locks import atomic_write_bytes
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+Offsets = Dict[str, Tuple[int, int]]
+
+_WS = re.compile(rb"[ \t\r\n]*")
+_STRING_TAIL = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+_STRUCTURAL = re.compile(rb'["{}\[\]]')
+_SCALAR_END = re.compile(rb"[,}\] \t\r\n]")
+
+
+def _string_end(buf, pos: int) -> int:
+    # `pos` is the opening quote.
+    match = _STRING_TAIL.match(buf, pos + 1)
+    if match is None:
+        raise ValueError(f"Unterminated string at byte {pos}")
+    return match.end()
+
+
+def _value_end(buf, pos: int) -> int:
+    first = buf[pos:pos + 1]
+    if first == b'"':
+        return _string_end(buf, pos)
+    if first not in (b"{", b"["):
+        match = _SCALAR_END.search(buf, pos)
+        return match.start() if match else len(buf)
+    depth = 0
+    while True:
+        match = _STRUCTURAL.search(buf, pos)
+        if match is None:
+            raise ValueError("Unexpected end of document")
+        char = match.group()
+        if char == b'"':
+            pos = _string_end(buf, match.start())
+            continue
+        depth += 1 if char in (b"{", b"[") else -1
+        pos = match.end()
+        if depth == 0:
+            return pos
+
+
+def scan_json_offsets(buf) -> Offsets:
+    """
+    Byte spans of the values of a top-level JSON object, found by skipping over each value's
+    structure without decoding it. `buf` can be an mmap, so nothing is held in memory but the spans.
+    """
+    pos = _WS.match(buf, 0).end()
+    if buf[pos:pos + 1] != b"{":
+        raise ValueError("Expected a JSON object")
+    offsets = {}
+    pos = _WS.match(buf, pos + 1).end()
+    if buf[pos:pos + 1] == b"}":
+        return offsets
+    while True:
+        if buf[pos:pos + 1] != b'"':
+            raise ValueError(f"Expected a key at byte {pos}")
+        key_end = _string_end(buf, pos)
+        key = serializers.loads_json(buf[pos:key_end])
+        pos = _WS.match(buf, key_end).end()
+        if buf[pos:pos + 1] != b":":
+            raise ValueError(f"Expected ':' at byte {pos}")
+        start = _WS.match(buf, pos + 1).end()
+        end = _value_end(buf, start)
+        offsets[key] = (start, end)
+        pos = _WS.match(buf, end).end()
+        separator = buf[pos:pos + 1]
+        if separator == b"}":
+            return offsets
+        if separator != b",":
+            raise ValueError(f"Expected ',' or '}}' at byte {pos}")
+        pos = _WS.match(buf, pos + 1).end()
+
+
+def scan_msgpack_offsets(f) -> Offsets:
+    unpacker = msgpack.Unpacker(f, raw=False)
+    offsets = {}
+    for _ in range(unpacker.read_map_header()):
+        key = unpacker.unpack()
+        start = unpacker.tell()
+        unpacker.skip()
+        offsets[key] = (start, unpacker.tell())
+    return offsets
+
+
+def encode_json_with_offsets(records: Dict[str, dict]) -> Tuple[bytes, Offsets]:
+    """The same bytes as dumps_json(records), plus the span of every record in them."""
+    parts = [b"{"]
+    offsets = {}
+    size = 1
+    for i, (key, record) in enumerate(records.items()):
+        prefix = (b"," if i else b"") + serializers.dumps_json(key) + b":"
+        value = serializers.dumps_json(record)
+        offsets[key] = (size + len(prefix), size + len(prefix) + len(value))
+        parts += [prefix, value]
+        size += len(prefix) + len(value)
+    parts.append(b"}")
+    return b"".join(parts), offsets
+
+
+class RecordOffsetIndex:
+    """
+    part_id -> (start, end) byte offsets of each record in a monolithic store file, so one
+    part can be read by seeking to it instead of parsing the whole file. The index is
+    rebuilt when the file's signature changes and kept in a `<file>.idx` sidecar so other
+    workers and restarts reuse it.
+    """
+
+    _instances: Dict[Path, "RecordOffsetIndex"] = {}
+    _instances_lock = Lock()
+
+    @classmethod
+    def for_path(cls, path: Path) -> "RecordOffsetIndex":
+        """One shared index per store file, so the in-process offsets survive across store objects."""
+        path = Path(path)
+        with cls._instances_lock:
+            if path not in cls._instances:
+                cls._instances[path] = cls(path)
+            return cls._instances[path]
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + ".idx")
+        self._signature: Optional[tuple] = None
+        self._offsets: Offsets = {}
+        self._lock = Lock()
+
+    def store(self, signature: tuple, offsets: Offsets):
+        """Persists offsets known to match the file at `signature` (e.g. right after writing it)."""
+        with self._lock:
+            self._signature, self._offsets = signature, offsets
+        try:
+            atomic_write_bytes(self.index_path, serializers.dumps_json({
+                "signature": list(signature),
+                "offsets": offsets
+            }))
+        except OSError as e:
+            print(f"[MemoryStore] Could not write record index {self.index_path}: {e}")
+
+    def keys(self) -> List[str]:
+        with self._open() as (f, offsets):
+            return list(offsets)
+
+    def __contains__(self, part_id: str) -> bool:
+        with self._open() as (f, offsets):
+            return part_id in offsets
+
+    def read(self, part_id: str) -> Optional[dict]:
+        return self.read_many([part_id]).get(part_id)
+
+    def read_many(self, part_ids: List[str]) -> Dict[str, dict]:
+        records = {}
+        with self._open() as (f, offsets):
+            for part_id in part_ids:
+                span = offsets.get(part_id)
+                if span is not None:
+                    f.seek(span[0])
+                    records[part_id] = serializers.loads(f.read(span[1] - span[0]))
+        return records
+
+    def iter_records(self) -> Iterator[dict]:
+        with self._open() as (f, offsets):
+            for start, end in offsets.values():
+                f.seek(start)
+                yield serializers.loads(f.read(end - start))
+
+    @contextmanager
+    def _open(self):
+        # Offsets are matched against the signature of the file actually opened, so a
+        # concurrent atomic replace can never pair one file's offsets with another's bytes.
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            yield None, {}
+            return
+        with f:
+            st = os.fstat(f.fileno())
+            signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+            with self._lock:
+                if signature != self._signature:
+                    offsets = self._load_sidecar(signature)
+                    if offsets is None:
+                        offsets = self._scan(f)
+                        scanned = True
+                    else:
+                        scanned = False
+                    self._signature, self._offsets = signature, offsets
+                else:
+                    scanned = False
+                offsets = self._offsets
+            if scanned:
+                self.store(signature, offsets)
+            yield f, offsets
+
+    def _load_sidecar(self, signature: tuple) -> Optional[Offsets]:
+        try:
+            data = serializers.loads_json(self.index_path.read_bytes())
+        except (OSError, ValueError):
+            return None
+        if tuple(data.get("signature") or ()) != signature:
+            return None
+        return {key: tuple(span) for key, span in data["offsets"].items()}
+
+    def _scan(self, f) -> Offsets:
+        f.seek(0)
+        head = f.read(64).lstrip()
+        if not head:
+            return {}
+        f.seek(0)
+        if head[:1] != b"{":
+            if msgpack is None:
+                raise ValueError("Store file is not JSON and the msgpack package is not installed")
+            return scan_msgpack_offsets(f)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return scan_json_offsets(buf)
@@ -0,0 +1,48 @@
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from core.append_log import AppendLog
+from core.log_rollups import rollups, score_rows
+from core.log_writer import writer
+
+SCORE_LOG_DIR = Path("data/score_log")
+LEGACY_SCORE_LOG_PATHS = [Path("data/score_log.jsonl"), Path("data/score_log.json")]
+# Score events are fire-and-forget by default: they reach disk with the log writer's next batch.
+DURABILITY = os.getenv("AXIS5_SCORE_LOG_DURABILITY", "none")
+
+_log = AppendLog(SCORE_LOG_DIR, "score_log", legacy_paths=LEGACY_SCORE_LOG_PATHS)
+
+def _update_rollups(batch: List[Dict], position: Optional[Tuple[str, int]]):
+    try:
+        with rollups.transaction() as conn:
+            mark = rollups.mark(conn, "score_log")
+            if mark is not None and position is not None:
+                if position <= mark:
+                    # A rebuild since this batch was written has counted it already.
+                    return
+                rollups.set_mark(conn, "score_log", None)
+            for entry in batch:
+                rollups.apply(conn, score_rows(entry))
+    except sqlite3.Error as e:
+        print(f"[ScoreLog] Error updating rollups: {e}")
+
+writer.on_write(_log, _update_rollups)
+
+def log_score(entry: Dict):
+    writer.submit(_log, entry, DURABILITY)
+
+def load_score_logs(since: Optional[str] = None, until: Optional[str] = None) -> List[Dict]:
+    writer.flush()
+    return _log.read_all(since, until)
+
+def iter_score_logs(since: Optional[str] = None, until: Optional[str] = None,
+                    upto: Optional[Tuple[str, int]] = None) -> Iterator[Dict]:
+    """Score events in log order; with `upto` (see score_log_end) only those written before it."""
+    if upto is None:
+        writer.flush()
+    return _log.iter_entries(since, until, upto=upto)
+
+def score_log_end() -> Optional[Tuple[str, int]]:
+    """Where the score log ends on disk; events still queued in the log writer come after it."""
+    return _log.end_position()
@@ -0,0 +1,61 @@
+import json
+import os
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Format used for new writes: "json" (compact, via orjson when installed) or "msgpack".
+# Reads detect the format from the data itself, so files written in either format
+# (including the old indented JSON) keep loading after this is changed.
+STORAGE_FORMAT = os.getenv("AXIS5_STORAGE_FORMAT", "json")
+
+_JSON_START = frozenset(b"{[")
+_WHITESPACE = b" \t\r\n"
+
+
+def _default(value: Any):
+    return str(value)
+
+
+def dumps(obj: Any, fmt: Optional[str] = None) -> bytes:
+    fmt = fmt or STORAGE_FORMAT
+    if fmt == "msgpack":
+        if msgpack is None:
+            raise RuntimeError("AXIS5_STORAGE_FORMAT=msgpack requires the msgpack package")
+        return msgpack.packb(obj, default=_default, use_bin_type=True)
+    if fmt == "json":
+        return dumps_json(obj)
+    raise ValueError(f"Unknown storage format: {fmt}")
+
+
+def dumps_json(obj: Any) -> bytes:
+    """Compact JSON bytes. Datetimes are written with str(), matching json.dumps(default=str)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    """Decodes JSON or msgpack, whichever `data` holds."""
+    stripped = data.lstrip(_WHITESPACE)
+    if not stripped:
+        raise ValueError("Empty document")
+    if stripped[0] in _JSON_START:
+        return loads_json(stripped)
+    if msgpack is None:
+        raise ValueError("Document is not JSON and the msgpack package is not installed")
+    return msgpack.unpackb(data, raw=False)
+
+
+def loads_json(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -3,7 +3,7 @@ from typing import Dict
 
 
 def tooling_advice(part_id: str) -> Dict:
-    memory = get_part_memory(part_id)
+    memory = get_part_memory(part_id, heavy_fields=())
     if not memory:
         return {"error": "Part not found"}
 
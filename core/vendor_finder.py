@@ -1,9 +1,9 @@
-from core.memory_store import get_part_memory
-from core.memory_store import get_part_memory
+from typing import Optional
+from core.part_context import PartContext, resolve_context
 from core.vendors_stub_db import get_all_vendors
 
-def find_matching_vendors(part_id: str, **kwargs):
-    memory = get_part_memory(part_id)
+def find_matching_vendors(part_id: str, ctx: Optional[PartContext] = None, **kwargs):
+    memory = resolve_context(part_id, ctx).memory
     if not memory:
         return {"error": "Part not found"}
 
@@ -1,22 +1,23 @@
-from core.memory_store import get_part_memory
+from core.part_context import PartContext
 from core.cost_optimizer import simulate_cost
 from core.dfm_engine import run_dfm_check
 from core.vendor_finder import find_matching_vendors
 
 def simulate_whatif(part_id: str, new_process: str, new_material: str, qty: int = None):
-    memory = get_part_memory(part_id)
+    ctx = PartContext(part_id)
+    memory = ctx.memory
     if not memory:
         return {"error": "Part not found"}
 
-    # Temporarily override memory
+    # Temporarily override memory; the scenario is evaluated on the context only and never saved
     memory.selected_process = new_process
     memory.selected_material = new_material
     if qty:
         memory.quantity = qty
 
-    dfm = run_dfm_check(part_id)
-    cost = simulate_cost(part_id)
-    vendors = find_matching_vendors(part_id)
+    dfm = run_dfm_check(part_id, ctx=ctx, persist=False)
+    cost = simulate_cost(part_id, ctx=ctx)
+    vendors = find_matching_vendors(part_id, ctx=ctx)
 
     return {
         "scenario": f"{new_process} + {new_material}",
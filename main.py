@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from api.cad_memory_api import router as cad_memory_router
 from api.design_intent_api import router as intent_router
@@ -12,13 +13,25 @@ from api.v2_log_api import router as v2_log_router
 from api.version_timeline_api import router as version_timeline_router
 from api.learning_log_v2_api import router as learning_log_v2_router
 from api.score_log_api import router as score_log_router
+from api.log_rollups_api import router as log_rollups_router
+from api.log_export_api import router as log_export_router
+from core.log_writer import writer
 
-app = FastAPI(title="Axis5 CAD Memory API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Writes out and fsyncs every log record still queued; the writer stays usable, e.g.
+    # when the app is started again in the same process (tests).
+    writer.flush(durable=True)
+
+app = FastAPI(title="Axis5 CAD Memory API", lifespan=lifespan)
 
 app.include_router(cad_memory_router, prefix="/api")
 app.include_router(intent_router)
 app.include_router(vendor_router, prefix="/vendor")
 app.include_router(material_router, prefix="/material/recommend")
+# Before learning_router, whose POST /log/{part_id} would otherwise take /log/score.
+app.include_router(score_log_router)
 app.include_router(learning_router)
 app.include_router(whatif_router)
 app.include_router(scenario_router)
@@ -27,4 +40,5 @@ app.include_router(version_router)
 app.include_router(v2_log_router)
 app.include_router(version_timeline_router)
 app.include_router(learning_log_v2_router)
-app.include_router(score_log_router)
+app.include_router(log_rollups_router)
+app.include_router(log_export_router)
@@ -0,0 +1,15 @@
+import argparse
+from core.memory_store import apply_retention
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive chat_history/memory_log entries outside the retention window.")
+    parser.add_argument("part_ids", nargs="*", help="parts to process (default: every part)")
+    args = parser.parse_args()
+
+    count = apply_retention(args.part_ids or None)
+    print(f"✅ Archived {count} entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+from core.learning_log import LEGACY_LOG_PATHS, LOG_DIR, convert_legacy_log
+
+
+def main():
+    count = convert_legacy_log()
+    if count:
+        print(f"✅ Converted {count} entries into {LOG_DIR}")
+    else:
+        legacy = " / ".join(str(path) for path in LEGACY_LOG_PATHS)
+        print(f"Nothing to convert: {LOG_DIR} already exists or {legacy} is missing or empty")
+
+
+if __name__ == "__main__":
+    main()
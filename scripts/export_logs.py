@@ -0,0 +1,23 @@
+import argparse
+from pathlib import Path
+from core.log_export import FORMATS, SOURCES, export_log
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export logs to Parquet/Arrow files partitioned by day and module.")
+    parser.add_argument("logs", nargs="*", help=f"logs to export: {', '.join(SOURCES)} (default: all)")
+    parser.add_argument("--format", dest="fmt", default="parquet", help=f"one of: {', '.join(FORMATS)}")
+    parser.add_argument("--since", help="only entries at or after this ISO timestamp")
+    parser.add_argument("--until", help="only entries up to this ISO timestamp (inclusive at its precision)")
+    parser.add_argument("--out", type=Path, help="output directory (default: data/exports/<log>); needs a single log")
+    args = parser.parse_args()
+    if args.out is not None and len(args.logs) != 1:
+        parser.error("--out needs exactly one log")
+
+    for log in args.logs or SOURCES:
+        result = export_log(log, args.fmt, args.since, args.until, args.out)
+        print(f"✅ {log}: {result['rows']} rows in {result['files']} files under {result['path']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import argparse
+from core import learning_log, learning_log_v2, query_log, score_log
+
+
+LOGS = {
+    "learning_log": learning_log._log,
+    "learning_log_v2": learning_log_v2._log,
+    "score_log": score_log._log,
+    "query_log": query_log.query_log,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compress and drop old log segments.")
+    parser.add_argument("--compress-after", type=int, default=7, help="gzip sealed segments older than this many days")
+    parser.add_argument("--drop-before", help="delete segments whose entries all predate this ISO date")
+    parser.add_argument("logs", nargs="*", help=f"logs to process: {', '.join(LOGS)} (default: all)")
+    args = parser.parse_args()
+    unknown = [name for name in args.logs if name not in LOGS]
+    if unknown:
+        parser.error(f"unknown logs: {', '.join(unknown)}")
+
+    for name in args.logs or LOGS:
+        log = LOGS[name]
+        compressed = log.compress_segments(args.compress_after)
+        dropped = log.drop_segments(args.drop_before) if args.drop_before else 0
+        print(f"✅ {name}: compressed {compressed} segments, dropped {dropped}")
+
+
+if __name__ == "__main__":
+    main()
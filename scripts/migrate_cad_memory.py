@@ -0,0 +1,17 @@
+import argparse
+from core.memory_store import migrate_memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy CAD part memory between storage layouts.")
+    parser.add_argument("--source", default="monolithic", help="storage mode to read from")
+    parser.add_argument("--target", default="sharded", help="storage mode to write to")
+    args = parser.parse_args()
+
+    count = migrate_memory(args.source, args.target)
+    print(f"✅ Migrated {count} parts from {args.source} to {args.target} storage")
+    print("Set AXIS5_MEMORY_STORAGE to the target mode to start using it.")
+
+
+if __name__ == "__main__":
+    main()
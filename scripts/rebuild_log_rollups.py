@@ -0,0 +1,10 @@
+from core.log_rollups import ROLLUPS_PATH, rebuild_rollups
+
+
+def main():
+    rebuild_rollups()
+    print(f"✅ Rebuilt log rollups in {ROLLUPS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import pytest
+
+from core import memory_store
+from core.record_index import RecordOffsetIndex
+
+
+@pytest.fixture(params=["monolithic", "sharded", "sqlite"])
+def store_mode(request, tmp_path, monkeypatch):
+    """Runs a test against each part storage mode, with the data/ paths under a fresh directory."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(memory_store, "STORAGE_MODE", request.param)
+    memory_store._sqlite_stores.clear()
+    memory_store._catalogs.clear()
+    memory_store._cache.invalidate()
+    RecordOffsetIndex._instances.clear()
+    yield request.param
+    memory_store._sqlite_stores.clear()
+    memory_store._catalogs.clear()
+    memory_store._cache.invalidate()
+    RecordOffsetIndex._instances.clear()
+
+
+@pytest.fixture
+def feedback_log(tmp_path, monkeypatch):
+    """learning_log_v2 and the rollups it maintains, kept under a fresh directory."""
+    from core import learning_log_v2
+    from core.append_log import AppendLog
+    from core.log_rollups import RollupStore
+    log = AppendLog(tmp_path / "learning_log_v2", "learning_log_v2", index_key=lambda record: record.get("id"))
+    monkeypatch.setattr(learning_log_v2, "_log", log)
+    monkeypatch.setattr(learning_log_v2, "rollups", RollupStore(tmp_path / "rollups.sqlite"))
+    return log
@@ -0,0 +1,174 @@
+import gzip
+import threading
+from datetime import datetime
+
+import pytest
+
+import core.append_log as append_log
+from core.append_log import AppendLog
+
+
+class _Later(datetime):
+    """datetime whose now() is far enough ahead that every existing segment counts as old."""
+
+    @classmethod
+    def now(cls, tz=None):
+        return datetime(2099, 1, 1)
+
+
+def _entry(i, key="a", timestamp=None):
+    return {"k": key, "i": i, "timestamp": timestamp or datetime.now().isoformat()}
+
+
+@pytest.fixture
+def log(tmp_path):
+    return AppendLog(tmp_path / "log", "test", index_key=lambda entry: entry.get("k"))
+
+
+@pytest.fixture
+def small_segments(monkeypatch):
+    monkeypatch.setattr(append_log, "SEGMENT_MAX_BYTES", 300)
+
+
+def test_append_and_read_back_in_order(log):
+    log.append_many([_entry(i, key=f"k{i % 3}") for i in range(10)])
+    log.append(_entry(10, key="k1"))
+    assert [e["i"] for e in log.read_all()] == list(range(11))
+    assert [e["i"] for e in log.read_key("k1")] == [1, 4, 7, 10]
+    assert [e["i"] for e in log.tail(3)] == [8, 9, 10]
+
+
+def test_segments_roll_over_by_size(log, small_segments):
+    for i in range(40):
+        log.append(_entry(i))
+    segments = log.segments()
+    assert len(segments) > 1
+    assert all(s["sealed"] for s in segments[:-1]) and not segments[-1]["sealed"]
+    assert [s["name"] for s in segments] == sorted(s["name"] for s in segments)
+    assert sum(s["entries"] for s in segments[:-1]) < 40
+    assert [e["i"] for e in log.read_all()] == list(range(40))
+    assert len(log.read_key("a")) == 40
+
+
+def test_range_reads_skip_segments_outside_the_range(log, small_segments):
+    for day in range(1, 6):
+        log.append_many([_entry(i, timestamp=f"2024-01-0{day}T00:00:0{i}") for i in range(5)])
+        # Seal the segment so the manifest records its timestamp range.
+        log.append_many([_entry(0, timestamp=f"2024-01-0{day}T23:00:00")] * 5)
+    opened = []
+    open_segment = log._open_segment
+    log._open_segment = lambda name: (opened.append(name), open_segment(name))[1]
+    entries = log.read_all("2024-01-03", "2024-01-03")
+    assert {e["timestamp"][:10] for e in entries} == {"2024-01-03"}
+    assert len(opened) < len(log.segments())
+
+
+def test_compressed_segments_stay_readable(log, small_segments, monkeypatch):
+    for i in range(40):
+        log.append(_entry(i, key=f"k{i % 2}"))
+    before = log.read_all()
+    monkeypatch.setattr(append_log, "datetime", _Later)
+    compressed = log.compress_segments(older_than_days=1)
+    monkeypatch.undo()
+    segments = log.segments()
+    assert compressed == len(segments) - 1
+    first = log.root / f"{segments[0]['name']}.jsonl.gz"
+    assert first.exists() and not (log.root / f"{segments[0]['name']}.jsonl").exists()
+    with gzip.open(first, "rb") as f:
+        assert f.readline().startswith(b"{")
+    assert log.read_all() == before
+    assert [e["i"] for e in log.read_key("k1")] == list(range(1, 40, 2))
+    log.append(_entry(40, key="k1"))
+    assert log.read_key("k1")[-1]["i"] == 40
+
+
+def test_torn_final_line_is_skipped_and_not_merged(log):
+    log.append_many([_entry(0), _entry(1)])
+    segment = log.segments()[-1]["name"]
+    with open(log.root / f"{segment}.jsonl", "ab") as f:
+        f.write(b'{"k": "a", "i": 99, "timest')
+    assert [e["i"] for e in log.read_all()] == [0, 1]
+    log.append(_entry(2))
+    assert [e["i"] for e in log.read_all()] == [0, 1, 2]
+    assert [e["i"] for e in log.read_key("a")] == [0, 1, 2]
+
+
+def test_end_position_bounds_reads(log):
+    assert log.end_position() is None
+    end = log.append_many([_entry(0), _entry(1)])
+    assert end == log.end_position()
+    log.append(_entry(2))
+    assert [e["i"] for e in log.iter_entries(upto=end)] == [0, 1]
+    assert log.end_position() > end
+
+
+def _keep_even(snapshot):
+    names = {name for name, _ in snapshot()}
+    return {name: [e for _, e in snapshot([name]) if e["i"] % 2 == 0] for name in names}
+
+
+def test_compaction_keeps_entries_appended_meanwhile(log, small_segments):
+    for i in range(20):
+        log.append(_entry(i))
+
+    def transform(snapshot):
+        plans = _keep_even(snapshot)
+        # Written after the snapshot was taken, while the new segments are being built.
+        log.append_many([_entry(100), _entry(101)])
+        return plans
+
+    assert log.compact(transform)
+    assert [e["i"] for e in log.read_all()] == list(range(0, 20, 2)) + [100, 101]
+    assert [e["i"] for e in log.read_key("a")] == list(range(0, 20, 2)) + [100, 101]
+
+
+def test_compaction_concurrent_with_appending_thread(log, small_segments):
+    for i in range(30):
+        log.append(_entry(i))
+    stop = threading.Event()
+    appended = []
+
+    def append():
+        i = 1000
+        while not stop.is_set():
+            log.append(_entry(i, key="b"))
+            appended.append(i)
+            i += 1
+
+    thread = threading.Thread(target=append)
+    thread.start()
+    try:
+        for _ in range(5):
+            log.compact(lambda snapshot: {
+                name: [e for _, e in snapshot([name]) if e["k"] == "b" or e["i"] % 2 == 0]
+                for name in {name for name, _ in snapshot()}
+            })
+    finally:
+        stop.set()
+        thread.join()
+    entries = log.read_all()
+    assert [e["i"] for e in entries if e["k"] == "a"] == list(range(0, 30, 2))
+    assert [e["i"] for e in entries if e["k"] == "b"] == appended
+    assert [e["i"] for e in log.read_key("b")] == appended
+
+
+def test_compaction_gives_up_when_a_segment_is_replaced(log):
+    log.append_many([_entry(i) for i in range(4)])
+
+    def transform(snapshot):
+        plans = _keep_even(snapshot)
+        log.rewrite([_entry(50)])
+        return plans
+
+    assert not log.compact(transform)
+    assert [e["i"] for e in log.read_all()] == [50]
+
+
+def test_legacy_file_is_imported_once(tmp_path):
+    legacy = tmp_path / "old.jsonl"
+    legacy.write_text('{"i": 1, "timestamp": "2024-05-01T00:00:00"}\n{"i": 2, "timestamp": "2024-05-02T00:00:00"}\n')
+    log = AppendLog(tmp_path / "log", "test", legacy_paths=[legacy])
+    assert [e["i"] for e in log.read_all()] == [1, 2]
+    assert log.segments()[0]["name"] == "2024-05-01-000"
+    log.append({"i": 3})
+    assert [e["i"] for e in AppendLog(tmp_path / "log", "test", legacy_paths=[legacy]).read_all()] == [1, 2, 3]
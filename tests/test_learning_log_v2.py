@@ -0,0 +1,50 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.learning_log_v2_api import router
+from core import learning_log_v2
+
+
+def _add(i):
+    return learning_log_v2.add_feedback_entry("dfm", f"p{i}", "accept", confidenceScore=0.5)
+
+
+def test_updates_are_folded_and_compacted(feedback_log):
+    entries = [_add(i) for i in range(5)]
+    learning_log_v2.update_feedback_entry(entries[1]["id"], {"decision": "reject"})
+    learning_log_v2.update_feedback_entry(entries[1]["id"], {"reason": "thin wall"})
+    before = learning_log_v2.get_all_feedback_logs()
+    assert before[1]["decision"] == "reject" and before[1]["reason"] == "thin wall"
+    assert learning_log_v2.compact_feedback_log()
+    assert not any(record.get("op") for record in feedback_log.read_all())
+    assert learning_log_v2.get_all_feedback_logs() == before
+    assert learning_log_v2.get_feedback_entry(entries[1]["id"])["decision"] == "reject"
+
+
+def test_reserved_keys_cannot_corrupt_an_entry(feedback_log):
+    entry = _add(0)
+    learning_log_v2.update_feedback_entry(entry["id"], {"op": "update", "updates": {"x": 1}, "id": "other", "decision": "reject"})
+    assert learning_log_v2.compact_feedback_log()
+    [stored] = learning_log_v2.get_all_feedback_logs()
+    assert stored["id"] == entry["id"] and stored["decision"] == "reject"
+    assert "op" not in stored and "updates" not in stored
+    assert learning_log_v2.list_feedback()["entries"] == [stored]
+
+
+def test_malformed_update_records_are_kept_as_entries(feedback_log):
+    entry = _add(0)
+    # What an unfiltered {"op": "update"} update used to leave behind after compaction.
+    feedback_log.append({"id": "broken", "module": "dfm", "partId": "p1", "decision": "accept", "op": "update"})
+    assert learning_log_v2.compact_feedback_log() is not None
+    assert [e["partId"] for e in learning_log_v2.get_all_feedback_logs()] == [entry["partId"], "p1"]
+
+
+def test_patch_rejects_reserved_keys(feedback_log):
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+    entry = _add(0)
+    response = client.patch(f"/logs/feedback/{entry['id']}", json={"op": "update", "decision": "reject"})
+    assert response.status_code == 400
+    assert client.patch(f"/logs/feedback/{entry['id']}", json={"decision": "reject"}).status_code == 200
+    assert client.get("/logs/feedback").json()[0]["decision"] == "reject"
@@ -0,0 +1,109 @@
+import threading
+
+import pytest
+
+from core.append_log import AppendLog
+from core.log_writer import JsonlFile, LogWriter
+
+
+class _Target:
+    """Records each append_many() call instead of writing."""
+
+    def __init__(self, fail: Exception = None):
+        self.calls = []
+        self.fail = fail
+
+    def append_many(self, entries, durable=False):
+        if self.fail is not None:
+            raise self.fail
+        self.calls.append((list(entries), durable))
+        return len(self.calls)
+
+
+@pytest.fixture
+def writer():
+    # A long interval, so only waiting callers, flush() and close() write batches.
+    writer = LogWriter(flush_size=1000, flush_interval=60)
+    yield writer
+    writer.close()
+
+
+def test_waiting_writers_share_batches(writer):
+    target = _Target()
+    threads = [threading.Thread(target=writer.submit, args=(target, {"i": i}, "fsync")) for i in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(e["i"] for entries, _ in target.calls for e in entries) == list(range(50))
+    assert all(durable for _, durable in target.calls)
+
+
+def test_unwaited_records_are_written_on_flush(writer):
+    target = _Target()
+    writer.submit(target, {"i": 0}, "none")
+    writer.submit(target, {"i": 1}, "none")
+    assert target.calls == []
+    writer.flush()
+    assert target.calls == [([{"i": 0}, {"i": 1}], False)]
+
+
+def test_durable_flush_keeps_the_writer_open(writer):
+    target = _Target()
+    writer.submit(target, {"i": 0}, "none")
+    writer.flush(durable=True)
+    writer.submit(target, {"i": 1}, "write")
+    assert target.calls == [([{"i": 0}], True), ([{"i": 1}], False)]
+
+
+def test_close_writes_and_fsyncs_what_is_left(writer):
+    target = _Target()
+    writer.submit(target, {"i": 0}, "none")
+    writer.close()
+    assert target.calls == [([{"i": 0}], True)]
+    with pytest.raises(RuntimeError):
+        writer.submit(target, {"i": 1}, "none")
+    writer.flush()
+    writer.close()
+
+
+def test_minimum_overrides_a_lower_durability(writer):
+    target = _Target()
+    writer.submit(target, {"i": 0}, "none", minimum="write")
+    assert target.calls == [([{"i": 0}], False)]
+
+
+def test_write_errors_reach_waiting_callers(writer):
+    target = _Target(fail=ValueError("bad record"))
+    with pytest.raises(ValueError):
+        writer.submit(target, {"i": 0}, "write")
+
+
+def test_failing_hook_does_not_stop_later_hooks(writer):
+    failing, working = _Target(), _Target()
+    seen = []
+
+    def fail(entries, result):
+        raise RuntimeError("hook failed")
+
+    writer.on_write(failing, fail)
+    writer.on_write(working, lambda entries, result: seen.append((entries, result)))
+    writer.submit(failing, {"i": 0}, "write")
+    writer.submit(working, {"i": 1}, "write")
+    writer.flush(hooks=True)
+    assert seen == [([{"i": 1}], 1)]
+
+
+def test_hooks_get_the_append_log_position(writer, tmp_path):
+    log = AppendLog(tmp_path / "log", "test")
+    positions = []
+    writer.on_write(log, lambda entries, position: positions.append(position))
+    writer.submit(log, {"i": 0}, "write")
+    writer.flush(hooks=True)
+    assert positions == [log.end_position()]
+
+
+def test_jsonl_file_target(writer, tmp_path):
+    target = JsonlFile(tmp_path / "pool.jsonl", "test")
+    writer.submit_many(target, [{"i": 0}, {"i": 1}], "fsync")
+    assert (tmp_path / "pool.jsonl").read_bytes().count(b"\n") == 2
@@ -0,0 +1,73 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.cad_memory_api import router
+from core import memory_store
+from core.memory_types import PartMemory
+
+
+@pytest.fixture
+def client(store_mode):
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    memory_store.save_part_memory(PartMemory(part_id="a", quantity=5))
+    return TestClient(app)
+
+
+def test_matching_etag_gives_not_modified(client):
+    response = client.get("/api/memory/a")
+    etag = response.headers["etag"]
+    assert response.status_code == 200 and response.json()["quantity"] == 5
+    cached = client.get("/api/memory/a", headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.headers["etag"] == etag and not cached.content
+    assert client.get("/api/memory/a", headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+    assert client.get("/api/memory/a", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_saves_and_log_appends_change_the_etag(client):
+    full = client.get("/api/memory/a").headers["etag"]
+    summary = client.get("/api/memory/a/summary").headers["etag"]
+    client.patch("/api/memory/a/log", json={"action": "note", "detail": "x"})
+    # The summary leaves out memory_log, so a log append does not invalidate it.
+    assert client.get("/api/memory/a/summary", headers={"If-None-Match": summary}).status_code == 304
+    assert client.get("/api/memory/a", headers={"If-None-Match": full}).status_code == 200
+    memory_store.save_part_memory(PartMemory(part_id="a", quantity=6))
+    response = client.get("/api/memory/a/summary", headers={"If-None-Match": summary})
+    assert response.status_code == 200 and response.json()["quantity"] == 6
+
+
+def test_unknown_part_has_no_etag(client):
+    response = client.get("/api/memory/missing", headers={"If-None-Match": "*"})
+    assert response.status_code == 404 and "etag" not in response.headers
+
+
+def _all_pages(client, **params):
+    pages = []
+    cursor = None
+    while True:
+        body = client.get("/api/parts", params={**params, **({"cursor": cursor} if cursor else {})}).json()
+        pages.append([p["part_id"] for p in body["parts"]])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_catalog_pages_follow_the_cursor(client):
+    memory_store.save_part_memories([
+        PartMemory(part_id=f"p{i}", quantity=i, selected_process="CNC" if i % 2 else "casting") for i in range(7)
+    ])
+    assert _all_pages(client, limit=3) == [["a", "p0", "p1"], ["p2", "p3", "p4"], ["p5", "p6"]]
+    assert _all_pages(client, limit=2, process="cnc") == [["p1", "p3"], ["p5"]]
+    assert _all_pages(client, min_quantity=2, max_quantity=5, process="casting") == [["p2", "p4"]]
+
+
+def test_catalog_is_built_for_parts_saved_before_it(client):
+    # Written straight to storage, so only the first listing's rebuild can index it.
+    memory_store.get_store().save("old", {"part_id": "old", "quantity": 9})
+    assert "old" in [p["part_id"] for p in client.get("/api/parts", params={"min_quantity": 9}).json()["parts"]]
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", "YQ", "_w=="])
+def test_malformed_cursor_is_a_bad_request(client, cursor):
+    assert client.get("/api/parts", params={"cursor": cursor}).status_code == 400
@@ -0,0 +1,40 @@
+from core import memory_store
+from core.memory_cache import PartMemoryCache
+from core.memory_types import PartMemory
+
+
+def test_signature_change_is_a_miss():
+    cache = PartMemoryCache(max_size=4)
+    cache.put("a", (1,), PartMemory(part_id="a", quantity=1))
+    assert cache.get("a", (1,)).quantity == 1
+    assert cache.get("a", (2,)) is None
+    assert cache.get("a", (1,)) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_least_recently_used_part_is_evicted():
+    cache = PartMemoryCache(max_size=2)
+    for part_id in "abc":
+        cache.put(part_id, (1,), PartMemory(part_id=part_id))
+        cache.get("a", (1,))
+    assert cache.get("b", (1,)) is None
+    assert cache.get("a", (1,)) is not None and cache.get("c", (1,)) is not None
+
+
+def test_cached_objects_are_not_shared():
+    cache = PartMemoryCache()
+    cache.put("a", (1,), PartMemory(part_id="a", quantity=1))
+    cache.get("a", (1,)).quantity = 99
+    assert cache.get("a", (1,)).quantity == 1
+
+
+def test_repeat_reads_hit_until_the_file_changes(store_mode):
+    memory_store.save_part_memory(PartMemory(part_id="a", quantity=1))
+    memory_store.get_part_memory("a")
+    hits = memory_store.memory_cache_stats()["hits"]
+    assert memory_store.get_part_memory("a").quantity == 1
+    assert memory_store.memory_cache_stats()["hits"] == hits + 1
+    # Written straight to storage, as another worker process would, without touching this cache.
+    store = memory_store.get_store()
+    store.save("a", {**store.load("a"), "quantity": 2})
+    assert memory_store.get_part_memory("a").quantity == 2
@@ -0,0 +1,37 @@
+import asyncio
+import json
+
+from api.cad_memory_api import _part_event_stream
+from core import memory_store
+from core.memory_types import PartMemory
+
+
+class _Request:
+    async def is_disconnected(self):
+        return False
+
+
+def _parse(message):
+    kind, data = message.strip().split("\n")
+    return kind.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+def test_every_event_carries_the_etag_revision(store_mode):
+    memory_store.save_part_memory(PartMemory(part_id="a"))
+
+    async def collect():
+        stream = _part_event_stream("a", _Request())
+        ready = _parse(await stream.__anext__())
+        await asyncio.to_thread(memory_store.save_part_memory, PartMemory(part_id="a", quantity=3))
+        saved = _parse(await stream.__anext__())
+        after_save = memory_store.get_part_revision("a", include_log=True)
+        await asyncio.to_thread(memory_store.append_memory_log, "a", "note", "d")
+        logged = _parse(await stream.__anext__())
+        await stream.aclose()
+        return ready, saved, after_save, logged
+
+    ready, saved, after_save, logged = asyncio.run(collect())
+    assert ready[1]["revision"] != saved[1]["revision"] != logged[1]["revision"]
+    assert [kind for kind, _ in (ready, saved, logged)] == ["ready", "saved", "log"]
+    assert logged[1]["revision"] == memory_store.get_part_revision("a", include_log=True)
+    assert saved[1]["revision"] == after_save
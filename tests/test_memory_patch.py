@@ -0,0 +1,51 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.cad_memory_api import router
+from core import memory_store
+from core.memory_types import PartMemory
+
+
+@pytest.fixture
+def client(store_mode):
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    memory_store.save_part_memory(PartMemory(part_id="a", quantity=5))
+    return TestClient(app)
+
+
+def test_patch_with_if_match(client):
+    etag = client.get("/api/memory/a").headers["etag"]
+    response = client.patch("/api/memory/a", json=[
+        {"op": "replace", "path": "/quantity", "value": 50},
+        {"op": "add", "path": "/memory_log/-", "value": {"action": "qty", "detail": "50"}},
+    ], headers={"If-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] == client.get("/api/memory/a").headers["etag"] != etag
+    memory = memory_store.get_part_memory("a")
+    assert memory.quantity == 50 and [e["action"] for e in memory.dict()["memory_log"]] == ["qty"]
+    stale = client.patch("/api/memory/a", json=[{"op": "replace", "path": "/quantity", "value": 1}], headers={"If-Match": etag})
+    assert stale.status_code == 412
+    assert memory_store.get_part_memory("a").quantity == 50
+
+
+def test_unknown_fields_are_rejected(client):
+    response = client.patch("/api/memory/a", json=[{"op": "add", "path": "/bogus", "value": 1}])
+    assert response.status_code == 400
+    assert client.patch("/api/memory/a", json=[{"op": "replace", "path": "/revision", "value": "x"}]).status_code == 400
+
+
+def _patch_quantity(client, revision, quantity):
+    return client.patch("/api/memory/a", json=[
+        {"op": "test", "path": "/revision", "value": revision},
+        {"op": "replace", "path": "/quantity", "value": quantity},
+    ])
+
+
+def test_revision_test_operation_is_a_precondition(client):
+    # The ETag token and the revision field of the part as GET returns it both work.
+    assert _patch_quantity(client, memory_store.get_part_revision("a", include_log=True), 6).status_code == 200
+    assert _patch_quantity(client, client.get("/api/memory/a").json()["revision"], 7).status_code == 200
+    assert _patch_quantity(client, "stale", 9).status_code == 412
+    assert memory_store.get_part_memory("a").quantity == 7
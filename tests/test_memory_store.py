@@ -0,0 +1,91 @@
+import resource
+
+import pytest
+
+from core import memory_store
+from core.memory_backends import SQLiteMemoryStore
+from core.memory_types import PartMemory
+
+
+@pytest.fixture
+def few_open_files():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(256, hard), hard))
+    yield 256
+    resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+
+
+def test_batch_save_larger_than_the_open_file_limit(store_mode, few_open_files):
+    memories = [PartMemory(part_id=f"p{i}", quantity=i) for i in range(few_open_files * 2)]
+    memory_store.save_part_memories(memories)
+    assert memory_store.get_part_memory("p300", heavy_fields=()).quantity == 300
+    assert len(list(memory_store.LOCK_DIR.iterdir())) <= memory_store.LOCK_STRIPES * 2
+
+
+def _full_memory(part_id, quantity=1):
+    return PartMemory(
+        part_id=part_id,
+        quantity=quantity,
+        selected_process="cnc",
+        chat_history=[{"role": "user", "content": "hi"}],
+        memory_log=[{"timestamp": "2024-01-01T00:00:00", "action": "upload", "detail": part_id}],
+    )
+
+
+def test_round_trip(store_mode):
+    memory_store.save_part_memories([_full_memory("a", 1), _full_memory("b/2", 2)])
+    memory_store.append_memory_log("a", "note", "later")
+    memory = memory_store.get_part_memory("a")
+    assert memory.quantity == 1 and memory.chat_history == [{"role": "user", "content": "hi"}]
+    assert [e["action"] for e in memory.dict()["memory_log"]] == ["upload", "note"]
+    light = memory_store.get_part_memory("a", heavy_fields=())
+    assert light.quantity == 1 and light.chat_history == [] and light.memory_log == []
+    assert set(memory_store.get_part_memories(["a", "b/2", "missing"])) == {"a", "b/2"}
+    assert memory_store.part_exists("b/2") and not memory_store.part_exists("missing")
+
+
+@pytest.mark.parametrize("store_mode", ["sharded"], indirect=True)
+def test_sharded_mode_keeps_one_file_per_part(store_mode):
+    memory_store.save_part_memories([_full_memory(f"p{i}") for i in range(5)])
+    assert len(list(memory_store.SHARD_DIR.glob("*/*.json"))) == 5
+    assert not memory_store.MEMORY_PATH.exists()
+
+
+@pytest.mark.parametrize("store_mode", ["monolithic"], indirect=True)
+def test_migrate_monolithic_to_sharded(store_mode, monkeypatch):
+    memory_store.save_part_memories([_full_memory("a", 1), _full_memory("b", 2)])
+    memory_store.append_memory_log("a", "note", "later")
+    expected = {p: m.dict() for p, m in memory_store.get_part_memories(["a", "b"]).items()}
+    assert memory_store.migrate_memory("monolithic", "sharded") == 2
+    monkeypatch.setattr(memory_store, "STORAGE_MODE", "sharded")
+    memory_store._cache.invalidate()
+    migrated = {p: m.dict() for p, m in memory_store.get_part_memories(["a", "b"]).items()}
+    assert migrated == expected
+    assert [p["part_id"] for p in memory_store.list_parts()["parts"]] == ["a", "b"]
+
+
+@pytest.mark.parametrize("store_mode", ["sqlite"], indirect=True)
+def test_sqlite_writes_from_another_connection_are_seen(store_mode):
+    memory_store.save_part_memory(_full_memory("a", 1))
+    assert memory_store.get_part_memory("a").quantity == 1
+    # A second store on the same file stands in for another worker process.
+    other = SQLiteMemoryStore(memory_store.SQLITE_PATH)
+    record = other.load("a")
+    assert other.side.read("a", "chat_history") == [{"role": "user", "content": "hi"}]
+    other.save("a", {**record, "quantity": 7})
+    other.journal.append("a", [{"timestamp": "2024-01-02T00:00:00", "action": "note", "detail": "x"}])
+    memory = memory_store.get_part_memory("a")
+    assert memory.quantity == 7 and [e["action"] for e in memory.dict()["memory_log"]] == ["upload", "note"]
+    indexes = {row["name"] for row in other.connection().execute("PRAGMA index_list(parts)")}
+    assert {"idx_parts_quantity", "idx_parts_selected_process"} <= indexes
+
+
+@pytest.mark.parametrize("store_mode", ["sharded"], indirect=True)
+def test_migrate_sharded_to_sqlite(store_mode, monkeypatch):
+    memory_store.save_part_memories([_full_memory("a", 1), _full_memory("b", 2)])
+    expected = {p: m.dict() for p, m in memory_store.get_part_memories(["a", "b"]).items()}
+    assert memory_store.migrate_memory("sharded", "sqlite") == 2
+    monkeypatch.setattr(memory_store, "STORAGE_MODE", "sqlite")
+    memory_store._cache.invalidate()
+    assert {p: m.dict() for p, m in memory_store.get_part_memories(["a", "b"]).items()} == expected
+    assert [p["part_id"] for p in memory_store.list_parts(min_quantity=2)["parts"]] == ["b"]
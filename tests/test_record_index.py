@@ -0,0 +1,94 @@
+import pytest
+
+from core import serializers
+from core.record_index import (
+    RecordOffsetIndex,
+    encode_json_with_offsets,
+    scan_json_offsets,
+    scan_msgpack_offsets,
+)
+
+RECORDS = {
+    "a": {"part_id": "a", "quantity": 5, "tags": ["x", "y"]},
+    "b/1": {"part_id": "b/1", "note": 'braces {} [] and "quotes" \\ inside', "nested": {"deep": [1, {"z": None}]}},
+    "ü": {"part_id": "ü", "score": -1.5e3, "ok": True},
+}
+
+
+def _spans(data: bytes, offsets):
+    return {key: serializers.loads_json(data[start:end]) for key, (start, end) in offsets.items()}
+
+
+def test_encoded_offsets_match_the_bytes():
+    data, offsets = encode_json_with_offsets(RECORDS)
+    assert data == serializers.dumps_json(RECORDS)
+    assert _spans(data, offsets) == RECORDS
+
+
+def test_json_scan_finds_the_same_spans():
+    data, offsets = encode_json_with_offsets(RECORDS)
+    assert scan_json_offsets(data) == offsets
+
+
+def test_json_scan_handles_whitespace_and_scalars():
+    data = b'\n{ "a" : { "x" : "}" } ,\n  "b":[1, "]"],"c": 12.5 , "d":null, "e":"\\""}\n'
+    offsets = scan_json_offsets(data)
+    assert _spans(data, offsets) == {"a": {"x": "}"}, "b": [1, "]"], "c": 12.5, "d": None, "e": '"'}
+
+
+def test_json_scan_of_empty_object():
+    assert scan_json_offsets(b" {} ") == {}
+
+
+@pytest.mark.parametrize("data", [b"[1, 2]", b'{"a": 1', b'{"a" 1}', b'{"a": "x}', b'{"a": 1 "b": 2}'])
+def test_json_scan_rejects_malformed_documents(data):
+    with pytest.raises(ValueError):
+        scan_json_offsets(data)
+
+
+def test_msgpack_scan_finds_each_record(tmp_path):
+    msgpack = pytest.importorskip("msgpack")
+    data = msgpack.packb(RECORDS, use_bin_type=True)
+    path = tmp_path / "store.msgpack"
+    path.write_bytes(data)
+    with open(path, "rb") as f:
+        offsets = scan_msgpack_offsets(f)
+    assert {key: msgpack.unpackb(data[start:end], raw=False) for key, (start, end) in offsets.items()} == RECORDS
+
+
+def test_index_reads_single_records_and_reuses_its_sidecar(tmp_path):
+    path = tmp_path / "store.json"
+    path.write_bytes(serializers.dumps_json(RECORDS))
+    index = RecordOffsetIndex(path)
+    assert index.read("b/1") == RECORDS["b/1"]
+    assert index.read("missing") is None
+    assert index.index_path.exists()
+    # A fresh instance (another worker) loads the sidecar instead of scanning.
+    other = RecordOffsetIndex(path)
+    other._scan = None
+    assert other.read_many(["a", "ü"]) == {"a": RECORDS["a"], "ü": RECORDS["ü"]}
+    assert list(other.iter_records()) == list(RECORDS.values())
+
+
+def test_index_rescans_after_the_file_changes(tmp_path):
+    path = tmp_path / "store.json"
+    path.write_bytes(serializers.dumps_json(RECORDS))
+    index = RecordOffsetIndex(path)
+    assert index.keys() == list(RECORDS)
+    changed = {"c": {"part_id": "c"}, **RECORDS}
+    path.write_bytes(serializers.dumps_json(changed))
+    assert index.keys() == list(changed)
+    assert index.read("c") == {"part_id": "c"}
+
+
+def test_index_of_a_missing_file_is_empty(tmp_path):
+    assert RecordOffsetIndex(tmp_path / "none.json").read_many(["a"]) == {}
+
+
+def test_membership_checks_the_current_file(tmp_path):
+    path = tmp_path / "store.json"
+    path.write_bytes(serializers.dumps_json(RECORDS))
+    index = RecordOffsetIndex(path)
+    assert "b/1" in index and "c" not in index
+    path.write_bytes(serializers.dumps_json({"c": {"part_id": "c"}}))
+    assert "c" in index and "b/1" not in index
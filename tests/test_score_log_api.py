@@ -0,0 +1,27 @@
+import pytest
+
+from core import score_log
+from core.append_log import AppendLog
+from core.log_writer import writer
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    pytest.importorskip("reportlab")  # main imports every router, including the PDF export
+    from fastapi.testclient import TestClient
+    import main
+    monkeypatch.setattr(score_log, "_log", AppendLog(tmp_path / "score_log", "score_log"))
+    return TestClient(main.app)
+
+
+def test_score_events_reach_the_score_log(client):
+    response = client.post("/log/score", json={"partId": "p1", "score": 82, "timestamp": "2026-01-01T00:00:00"})
+    assert response.status_code == 200 and response.json() == {"status": "ok"}
+    writer.flush()
+    assert score_log._log.read_all() == [{"partId": "p1", "score": 82, "timestamp": "2026-01-01T00:00:00"}]
+
+
+def test_non_object_score_events_are_rejected(client):
+    assert client.post("/log/score", json=[1, 2]).status_code == 422
+    writer.flush()
+    assert score_log._log.read_all() == []